@@ -1,24 +1,31 @@
 import streamlit as st
-import pandas as pd
 import os
 import json
 import subprocess
-import shutil
-import io
-import re
-from datetime import datetime
 import time
-import gc
+
+from samplemanager import config, perf
+from samplemanager.analytics import FREQS, aggregate, get_stats, list_params, status_distribution, time_series
+from samplemanager.backup import get_backup_engine
+from samplemanager.export import export_excel, export_parquet
+from samplemanager.files import format_size, get_file_manifest, open_folder
+from samplemanager.jobs import delete_folder, get_fs_queue, move_folder
+from samplemanager.params import PARAM_OPS, filter_by_params
+from samplemanager.paths import get_module_folder, get_project_folder, get_sample_folder
+from samplemanager.presets import load_presets, save_presets
+from samplemanager.projects import (delete_project, get_param_table, get_project_cache, load_project_content,
+                                    load_project_df, rename_project, save_project_df,
+                                    save_project_rows, search_samples)
+from samplemanager.samples import (SORT_OPTIONS, bulk_create, bulk_delete, bulk_update, rename_sample_logic,
+                                   sort_samples, template_content)
+from samplemanager.storage import empty_project_df, get_storage
 
 # ================= 0. 全局配置 =================
-BASE_DIR = "Sample_System_V3.0"
-PROJECTS_DIR = os.path.normpath(os.path.join(BASE_DIR, "Projects"))
-BACKUP_DIR = os.path.normpath(os.path.join(BASE_DIR, "Backups"))
-CONFIG_FILE = os.path.normpath(os.path.join(BASE_DIR, "presets.json"))
+# 数据目录、存储后端、备份等核心配置见 samplemanager/config.py；这里只保留界面相关的设置
+PAGE_SIZES = [20, 50, 100, 200]
+TABLE_MODE_THRESHOLD = 500  # 筛选结果超过该条数时默认使用表格视图
 
-for path in [BASE_DIR, PROJECTS_DIR, BACKUP_DIR]:
-    if not os.path.exists(path):
-        os.makedirs(path)
+config.ensure_dirs()
 
 st.set_page_config(page_title="SampleManager V3.0", layout="wide", page_icon="🧪")
 
@@ -48,122 +55,84 @@ st.markdown(
 """,
     unsafe_allow_html=True,
 )
-
-# ================= 1. 核心工具逻辑 =================
-
-def execute_backup(project_name):
-    src = get_project_csv(project_name)
-    if os.path.exists(src):
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        dst = os.path.join(BACKUP_DIR, f"{project_name}_{date_str}.csv")
-        try: shutil.copy2(src, dst)
-        except: pass
-
-def load_presets():
-    if not os.path.exists(CONFIG_FILE):
-        defaults = {
-            "PLD_Thin_Film": {"Deposition": ["Laser_Energy", "Oxygen_Pressure"], "XRD_Test": ["Scan_Range"]},
-            "Ceramic_Sintering": {"Pressing": ["Pressure"], "Sintering": ["Temperature"]}
-        }
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(defaults, f, ensure_ascii=False, indent=4)
-    try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f: return json.load(f)
-    except: return {}
-
-def save_presets(presets):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(presets, f, ensure_ascii=False, indent=4)
-
-def get_project_csv(name): return os.path.join(PROJECTS_DIR, f"{name}.csv")
-def get_project_folder(name): return os.path.join(PROJECTS_DIR, f"{name}_Files")
-def get_sample_folder(proj, sid):
-    p = os.path.join(get_project_folder(proj), sid)
-    if not os.path.exists(p): os.makedirs(p)
-    return p
-
-def load_project_df(project_name):
-    execute_backup(project_name)
-    src = get_project_csv(project_name)
-    if os.path.exists(src):
-        try:
-            with open(src, 'r', encoding='utf-8') as f:
-                df = pd.read_csv(f)
-            if "Content_JSON" not in df.columns: df["Content_JSON"] = "{}"
-            return df.fillna("").astype(str)
-        except: return pd.DataFrame(columns=["样品编号", "创建日期", "状态", "备注", "Content_JSON"])
-    return pd.DataFrame(columns=["样品编号", "创建日期", "状态", "备注", "Content_JSON"])
-
-def save_project_df(project_name, df):
-    execute_backup(project_name)
-    df.to_csv(get_project_csv(project_name), index=False, encoding='utf-8')
-
-def sanitize_filename(name): return re.sub(r'[\\/*?:"<>|]', "_", name)
-
-def open_folder(path):
-    if os.path.exists(path) and os.name == "nt":
-        subprocess.Popen(f'explorer "{path}"')
-        
-def get_module_folder(project_name, sample_id, mod_name):
-    sample_f = get_sample_folder(project_name, sample_id)
-    mod_f = os.path.join(sample_f, sanitize_filename(mod_name))
-    if not os.path.exists(mod_f): os.makedirs(mod_f)
-    return mod_f
-
-def rename_sample_logic(project_name, df, old_sid, new_sid):
-    if not new_sid: return False, "编号不能为空"
-    if new_sid in df["样品编号"].values: return False, "新编号已存在"
-    old_folder = get_sample_folder(project_name, old_sid)
-    new_folder = os.path.join(get_project_folder(project_name), new_sid)
-    try:
-        gc.collect(); time.sleep(0.1)
-        if os.path.exists(old_folder): shutil.move(old_folder, new_folder)
-        df.loc[df["样品编号"] == old_sid, "样品编号"] = new_sid
-        save_project_df(project_name, df)
-        return True, "成功"
-    except Exception as e: return False, f"重命名失败: {e}"
+perf.begin_run(enabled=st.session_state.get("perf_on", config.PERF_ENABLED))  # 开关按会话保存
 
 # ================= 2. 侧边栏 =================
 
 with st.sidebar:
     st.title("🧪 SampleManager V3.0")
-    all_p = [f.replace(".csv", "") for f in os.listdir(PROJECTS_DIR) if f.endswith(".csv")]
+    all_p = get_storage().list_projects()
     current_project = st.selectbox("选择项目", sorted(all_p)) if all_p else None
+    perf.annotate(project=current_project)
+    analytics_mode = st.toggle("📊 跨项目分析", key="analytics_mode", disabled=not all_p)
 
     st.divider()
     with st.expander("📁 项目与备份管理", expanded=False):
         new_p = st.text_input("新建项目名")
         if st.button("➕ 创建项目", use_container_width=True):
             if new_p:
-                save_project_df(new_p, pd.DataFrame(columns=["样品编号", "创建日期", "状态", "备注", "Content_JSON"]))
+                save_project_df(new_p, empty_project_df())
                 st.rerun()
         
         if current_project:
             st.markdown(f"**操作项目: `{current_project}`**")
             new_p_name = st.text_input("重命名为:", value=current_project)
             if st.button("📝 确认项目更名", use_container_width=True):
-                try:
-                    gc.collect(); time.sleep(0.2)
-                    shutil.move(get_project_csv(current_project), get_project_csv(new_p_name))
-                    if os.path.exists(get_project_folder(current_project)):
-                        shutil.move(get_project_folder(current_project), get_project_folder(new_p_name))
-                    st.rerun()
-                except Exception as e: st.error(f"失败: {e}")
+                new_p_name = new_p_name.strip()
+                if not new_p_name or new_p_name == current_project: st.warning("请输入与当前不同的新项目名")
+                else:
+                    try:
+                        rename_project(current_project, new_p_name)
+                        move_folder(get_project_folder(current_project), get_project_folder(new_p_name))
+                        st.rerun()
+                    except Exception as e: st.error(f"失败: {e}")
             
             # --- 【恢复】项目物理删除确认 ---
             with st.popover("🗑️ 物理删除该项目", use_container_width=True):
-                st.error("警告：此操作不可逆！将删除CSV及物理文件。")
+                st.error("警告：此操作不可逆！将删除项目数据及物理文件。")
                 if st.button("🔥 确认永久删除项目", type="primary", use_container_width=True):
                     try:
-                        gc.collect()
-                        time.sleep(0.1)
-                        if os.path.exists(get_project_csv(current_project)):
-                            os.remove(get_project_csv(current_project))
-                        if os.path.exists(get_project_folder(current_project)):
-                            shutil.rmtree(get_project_folder(current_project))
+                        delete_project(current_project)
+                        delete_folder(get_project_folder(current_project))
                         st.rerun()
                     except Exception as e: st.error(f"删除失败: {e}")
 
+    if current_project:
+        with st.expander("📤 导出", expanded=False):
+            ex_fmt = st.radio("格式", ["CSV", "Excel", "Parquet"], horizontal=True, label_visibility="collapsed")
+            ext = {"CSV": "csv", "Excel": "xlsx", "Parquet": "parquet"}[ex_fmt]
+            dst = os.path.join(config.EXPORT_DIR, f"{current_project}.{ext}")
+            if st.button(f"⚙️ 生成 {ex_fmt}", use_container_width=True):
+                try:
+                    if ex_fmt == "CSV": get_storage().export_csv(current_project, dst)
+                    elif ex_fmt == "Excel": export_excel(current_project, dst)
+                    else: export_parquet(current_project, dst)
+                    st.session_state["export_file"] = dst
+                except ImportError as e: st.error(f"缺少依赖: {e.name}，请先 pip install {e.name}")
+                except Exception as e: st.error(f"导出失败: {e}")
+            if st.session_state.get("export_file") == dst and os.path.exists(dst):
+                # 传入函数延迟读取：只在点击下载时才读文件，平时重跑不把导出文件载入内存
+                def read_export(path=dst):
+                    with open(path, "rb") as f: return f.read()
+                st.download_button(f"⬇️ 下载 {os.path.basename(dst)}", read_export, file_name=os.path.basename(dst),
+                                   use_container_width=True)
+
+        engine = get_backup_engine()
+        bak_err = engine.errors.get(current_project)
+        if bak_err:
+            st.error(f"后台备份失败 ({bak_err['ts'].replace('T', ' ')}): {bak_err['error']}")
+            if st.button("🔁 重新备份", use_container_width=True):
+                engine.schedule(current_project, load_project_df(current_project)); engine.flush(current_project); st.rerun()
+        with st.expander("🕒 备份与恢复", expanded=False):
+            vers = engine.versions(current_project)[::-1]
+            if vers:
+                ver = st.selectbox("历史版本", vers, format_func=lambda e: f"{e['ts'].replace('T', ' ')} · {e['rows']} 行")
+                if st.button("↩️ 恢复到此版本", use_container_width=True):
+                    engine.flush(current_project)
+                    old_df = engine.restore(current_project, ver["ts"])
+                    if old_df is not None: save_project_df(current_project, old_df); st.rerun()
+            else: st.caption("暂无备份版本")
+
     with st.expander("📑 模板预设管理", expanded=False):
         presets = load_presets()
         target_pre = st.selectbox("选择/删除模板", ["--请选择--"] + list(presets.keys()))
@@ -179,14 +148,107 @@ with st.sidebar:
                 presets[n_pre_name] = {m: [] for m in mod_list}
                 save_presets(presets); st.rerun()
 
+    cache = get_project_cache()
+    st.caption(f"存储: {get_storage().name} | 项目缓存: 命中 {cache['hits']} / 未命中 {cache['misses']}")
+    for name, msg in get_storage().migration_issues.items(): st.warning(f"CSV 迁移 {name}: {msg}")
+    if current_project and st.button("🔄 重新扫描文件", use_container_width=True):
+        stats = get_file_manifest(current_project).scan()
+        st.toast(f"已扫描: 读取 {stats['listed']} 个目录，跳过 {stats['skipped']} 个未变目录")
+
+    fs_queue = get_fs_queue()
+
+    @st.fragment(run_every=1 if fs_queue.active() else None)
+    def fs_jobs_panel():
+        active, failed = fs_queue.active(), fs_queue.failed()
+        if not active and not failed:
+            # 轮询期间任务全部完成：整页重跑一次以刷新文件统计并停止轮询
+            if st.session_state.pop("fs_polling", False): st.rerun()
+            return
+        st.session_state["fs_polling"] = bool(active)
+        st.markdown("**📦 文件任务**")
+        for j in active:
+            name = os.path.basename(j["src"]) + (f" → {os.path.basename(j['dst'])}" if j["dst"] else "")
+            label = f"{'移动' if j['op'] == 'move' else '删除'} {name}"
+            if j["attempts"] > 1: label += f" (第 {j['attempts']} 次尝试: {j['error'][:40]})"
+            st.progress(min(j["done"] / j["total"], 1.0) if j["total"] else 0.0, text=label)
+        for j in failed:
+            st.error(f"{'移动' if j['op'] == 'move' else '删除'}失败: {j['src']}\n\n{j['error']}")
+            r1, r2 = st.columns(2)
+            if r1.button("🔁 重试", key=f"fs_retry_{j['id']}", use_container_width=True): fs_queue.retry(j["id"]); st.rerun()
+            if r2.button("✖ 忽略", key=f"fs_dismiss_{j['id']}", use_container_width=True): fs_queue.dismiss(j["id"]); st.rerun()
+
+    fs_jobs_panel()
     if st.button("📂 备份文件夹", use_container_width=True):
-        if os.name == 'nt': subprocess.Popen(f'explorer "{BACKUP_DIR}"')
+        if os.name == 'nt': subprocess.Popen(f'explorer "{config.BACKUP_DIR}"')
+
+    with st.expander("🩺 性能诊断"):
+        # 本会话的开关 (下次重跑生效)：关闭时各计时点只做一次判断，不记录也不写日志；不影响其他会话
+        perf_on = st.toggle("记录每次重跑的耗时", value=config.PERF_ENABLED, key="perf_on")
+        runs = perf.history()
+        if not runs: st.caption("暂无记录" + ("，操作页面后刷新" if perf_on else ""))
+        else:
+            n_runs = st.slider("统计最近 N 次重跑", 1, len(runs), min(20, len(runs)), key="perf_n") if len(runs) > 1 else 1
+            st.dataframe(perf.summarize(runs[-n_runs:]), use_container_width=True)
+            st.dataframe([{"时间": r["ts"][11:], "总 ms": r["total_ms"], "项目": r.get("project") or "", "模式": r.get("mode", ""),
+                           "中断": "↻" if r.get("interrupted") else "", "最慢阶段": max(r["spans"], key=lambda s: s["ms"])["name"] if r["spans"] else ""}
+                          for r in reversed(runs[-n_runs:])], hide_index=True, use_container_width=True)
+        bg = perf.background()
+        if bg:
+            st.caption("后台任务 (备份、文件夹)")
+            st.dataframe([{"时间": b["ts"][11:], "阶段": b["name"], "ms": b["ms"], "行数": b.get("rows"), "字节": b.get("bytes")}
+                          for b in reversed(bg[-10:])], hide_index=True, use_container_width=True)
+        st.caption(f"日志: {config.PERF_LOG}")
 
 # ================= 3. 主界面 =================
 
-if current_project:
+if analytics_mode:
+    # --- 跨项目分析：各项目的中间结果按指纹缓存，切换条件或新增项目只重算变化的部分 ---
+    perf.annotate(mode="analytics")
+    st.subheader("📊 跨项目分析")
+    all_projects = sorted(all_p)
+    an_projects = st.multiselect("项目", all_projects, default=all_projects, key="an_projects")
+    plist = list_params(an_projects)
+    if plist.empty: st.info("所选项目中没有参数数据")
+    else:
+        c1, c2, c3, c4 = st.columns([2, 2, 3, 1])
+        an_mod = c1.selectbox("模块", ["*"] + sorted(plist["module"].unique()),
+                              format_func=lambda m: "(任意模块)" if m == "*" else m, key="an_mod")
+        p_rows = plist if an_mod == "*" else plist[plist["module"] == an_mod]
+        an_par = c2.selectbox("参数", sorted(p_rows["param"].unique()), key="an_par")
+        group_opts = {"项目": "project", "状态": "状态", "时间": "period"}
+        an_by = c3.multiselect("分组", list(group_opts), default=["项目"], key="an_by")
+        an_freq = c4.selectbox("周期", list(FREQS), index=2, format_func=FREQS.get, key="an_freq")
+        x_opts = [None] + [(m, p) for m, p in zip(plist["module"], plist["param"]) if (m, p) != (an_mod, an_par)]
+        an_x = st.selectbox("再按另一参数的取值分组", x_opts, format_func=lambda o: "(不分组)" if o is None else f"{o[0]}.{o[1]}", key="an_x")
+        by = [group_opts[b] for b in an_by] + ([("x", *an_x)] if an_x else [])
+        labels = {"project": "项目", "n": "样品数", "count": "数值个数", "mean": "均值", "min": "最小", "max": "最大"}
+
+        t1, t2, t3 = st.tabs(["📋 分组统计", "📈 时间趋势", "🏷️ 状态分布"])
+        with t1:
+            res = aggregate(an_projects, an_mod, an_par, by, an_freq)
+            st.dataframe(res.rename(columns=labels), hide_index=True, use_container_width=True)
+        with t2:
+            ts = time_series(an_projects, an_mod, an_par, an_freq, per_project=True)
+            if ts.empty: st.info("所选样品没有可识别的创建日期 (格式如 2024-05-01)")
+            else:
+                if ts["count"].sum():
+                    st.caption(f"{an_par} 均值 (按{FREQS[an_freq]})")
+                    st.line_chart(ts.pivot_table(index="时间", columns="project", values="mean"))
+                st.caption(f"含 {an_par} 的样品数 (按{FREQS[an_freq]})")
+                st.bar_chart(ts.pivot_table(index="时间", columns="project", values="n", aggfunc="sum"))
+        with t3:
+            dist = status_distribution(an_projects, an_mod, an_par)
+            if not dist.empty:
+                st.bar_chart(dist)
+                st.dataframe(dist, use_container_width=True)
+        stt_an = get_stats()
+        st.caption(f"已加载 {stt_an['projects']} 个项目 | 分析缓存: 命中 {stt_an['hits']} / 未命中 {stt_an['misses']}")
+
+elif current_project:
     df = load_project_df(current_project)
+    contents = load_project_content(current_project)
     if "edit_id" not in st.session_state: st.session_state["edit_id"] = None
+    perf.annotate(mode="list" if st.session_state["edit_id"] is None else "edit", rows=len(df))
 
     if st.session_state["edit_id"] is None:
         # --- A. 列表模式 ---
@@ -194,73 +256,179 @@ if current_project:
         with c1:
             presets = load_presets()
             with st.popover("➕ 新建样品", use_container_width=True):
-                def get_new_id(p_name, curr_df):
-                    i, exist = 1, set(curr_df["样品编号"].values)
-                    while f"{p_name}-{i:03d}" in exist: i += 1
-                    return f"{p_name}-{i:03d}"
                 if st.button("📄 空白样品", use_container_width=True):
-                    nid = get_new_id(current_project, df)
-                    new_row = {"样品编号": nid, "创建日期": datetime.now().strftime("%Y-%m-%d"), "状态": "制备中", "备注": "", "Content_JSON": "{}"}
-                    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                    save_project_df(current_project, df); st.session_state["edit_id"] = nid; st.rerun()
+                    nid = bulk_create(current_project, 1)[0]
+                    st.session_state["edit_id"] = nid; st.rerun()
                 for t in presets:
                     if st.button(f"📑 {t}", use_container_width=True):
-                        nid = get_new_id(current_project, df)
-                        content = {m: ({f: "" for f in fields} if isinstance(fields, list) else {}) for m, fields in presets[t].items()}
-                        df = pd.concat([df, pd.DataFrame([{"样品编号": nid, "创建日期": datetime.now().strftime("%Y-%m-%d"), "状态": "制备中", "备注": "", "Content_JSON": json.dumps(content, ensure_ascii=False)}])], ignore_index=True)
-                        save_project_df(current_project, df); st.session_state["edit_id"] = nid; st.rerun()
+                        nid = bulk_create(current_project, 1, template_content(presets[t]))[0]
+                        st.session_state["edit_id"] = nid; st.rerun()
 
-        with c2: search = st.text_input("🔍 搜索...", label_visibility="collapsed", placeholder="输入编号或备注...")
+        with c2: search = st.text_input("🔍 搜索...", label_visibility="collapsed", placeholder="编号/备注/状态/日期/参数值，支持 module:XRD_Test Laser_Energy:300",
+                                     help="空格分隔的条件同时满足；字段查询: module:模块名、id:编号、备注:文字、状态:完成、日期:2026-07、参数名:值")
         
         with c3: 
-            sort_opt = st.selectbox("排序方式", ["日期 (新→旧)", "日期 (旧→新)", "编号 (A-Z)", "编号 (Z-A)", "状态"], label_visibility="collapsed")
+            sort_opt = st.selectbox("排序方式", list(SORT_OPTIONS), label_visibility="collapsed")
+
+        pf_key = f"param_filters_{current_project}"
+        pf = st.session_state.setdefault(pf_key, [])
+        # 条件只在开关打开时生效；关闭后保留条件，重新打开即恢复
+        pf_on = st.toggle("🧮 参数筛选", value=bool(pf), key=f"pf_on_{current_project}")
+        if pf_on:
+            ptab = get_param_table(current_project)
+            with st.container(border=True):
+                f1, f2, f3, f4, f5, f6 = st.columns([2, 2, 1, 1.5, 1.5, 1])
+                f_mod = f1.selectbox("模块", ["*"] + sorted(ptab["module"].unique()),
+                                     format_func=lambda m: "(任意模块)" if m == "*" else m, key="pf_mod")
+                p_names = ptab["param"] if f_mod == "*" else ptab.loc[ptab["module"] == f_mod, "param"]
+                f_par = f2.selectbox("参数", sorted(p_names.unique()), key="pf_par")
+                f_op = f3.selectbox("条件", PARAM_OPS, key="pf_op")
+                f_v = f4.text_input("值" if f_op != "区间" else "下限", key="pf_v")
+                f_v2 = f5.text_input("上限", key="pf_v2", disabled=(f_op != "区间"))
+                f6.markdown("<div style='height:28px'></div>", unsafe_allow_html=True)
+                if f6.button("➕ 添加", use_container_width=True, disabled=not f_par):
+                    pf.append({"module": f_mod, "param": f_par, "op": f_op, "value": f_v, "value2": f_v2}); st.rerun()
+                for i, p in enumerate(pf):
+                    pc1, pc2 = st.columns([8, 1])
+                    cond = f"{p['value']} ~ {p['value2']}" if p["op"] == "区间" else f"{p['op']} {p['value']}"
+                    pc1.markdown(f"`{'*' if p['module'] == '*' else p['module']}.{p['param']}` {cond}")
+                    if pc2.button("✖", key=f"pf_del_{i}"): pf.pop(i); st.rerun()
+
+        man = get_file_manifest(current_project)
+        file_q = None
+        if st.toggle("📎 文件筛选", key=f"ff_{current_project}"):
+            ff1, ff2 = st.columns([1, 3])
+            ff_has = ff1.radio("文件", ["有文件", "无文件"], horizontal=True, label_visibility="collapsed", key="ff_has")
+            ff_pat = ff2.text_input("模块/文件名包含", placeholder="如 XRD、.raw (留空表示任意文件)",
+                                    label_visibility="collapsed", key="ff_pat")
+            file_q = (ff_has == "有文件", ff_pat.strip())
 
         st.divider()
-        v_df = df if not search else df[df.apply(lambda x: search.lower() in str(x.values).lower(), axis=1)]
-        
-        if sort_opt == "日期 (新→旧)": v_df = v_df.sort_values(by="创建日期", ascending=False)
-        elif sort_opt == "日期 (旧→新)": v_df = v_df.sort_values(by="创建日期", ascending=True)
-        elif sort_opt == "编号 (A-Z)": v_df = v_df.sort_values(by="样品编号", ascending=True)
-        elif sort_opt == "编号 (Z-A)": v_df = v_df.sort_values(by="样品编号", ascending=False)
-        elif sort_opt == "状态": v_df = v_df.sort_values(by="状态")
-
-        for idx, row in v_df.iterrows():
+        with perf.span("list.filter_sort", rows=len(df)) as sp:
+            v_df = df if not search else df[df["样品编号"].isin(search_samples(current_project, search))]
+            if pf and pf_on: v_df = v_df[v_df["样品编号"].isin(filter_by_params(get_param_table(current_project), pf))]
+            if file_q:
+                has = v_df["样品编号"].isin(man.samples_with_files(file_q[1]))
+                v_df = v_df[has if file_q[0] else ~has]
+            v_df = sort_samples(v_df, sort_opt)
+            sp.set(hits=len(v_df))
+
+        # 排序/筛选作用于全表，渲染只覆盖当前页
+        total = len(v_df)
+        vc1, vc2, vc3, vc4 = st.columns([2, 2, 2, 3])
+        view = vc1.radio("视图", ["🗂️ 卡片", "📋 表格"], index=int(total > TABLE_MODE_THRESHOLD),
+                         horizontal=True, label_visibility="collapsed", key=f"view_{current_project}")
+        page_size = vc2.selectbox("每页", PAGE_SIZES, index=1, key="page_size", label_visibility="collapsed",
+                                  format_func=lambda n: f"每页 {n} 条")
+        n_pages = max(1, -(-total // page_size))
+        page = vc3.number_input("页码", min_value=1, max_value=n_pages, value=1, step=1,
+                                key=f"page_{current_project}", label_visibility="collapsed")
+        page = min(int(page), n_pages)
+        vc4.caption(f"共 {total} 条 · 第 {page}/{n_pages} 页")
+        page_df = v_df.iloc[(page - 1) * page_size: page * page_size]
+        bulk_box = st.container()  # 批量操作面板需要表格的选中行，渲染完列表后再填充
+
+        def row_actions(row, key_p):
+            # 重命名/删除的弹出框只为选中的样品创建
             sid = row["样品编号"]
-            with st.container():
-                cols = st.columns([2.5, 4, 2.5])
-                with cols[0]:
-                    if st.button(f"📄 {sid}", key=f"btn_{sid}", use_container_width=True):
-                        st.session_state["edit_id"] = sid; st.rerun()
-                    stt = row["状态"]
-                    color = "orange" if stt == "制备中" else "green" if stt == "完成" else "red"
-                    st.markdown(f":{color}[● {stt}] &nbsp; `{row['创建日期']}`")
-                with cols[1]:
-                    try:
-                        modules = json.loads(row["Content_JSON"]).keys()
-                        if modules:
-                            tags_html = "".join([f'<span class="module-tag">{m}</span>' for m in modules])
-                            st.markdown(tags_html, unsafe_allow_html=True)
-                    except: pass
-                    st.caption(f"备注: {row['备注']}")
-                with cols[2]:
-                    b1, b2, b3 = st.columns([1, 1, 1])
-                    with b1.popover("✏️"):
-                        ren_sid = st.text_input("新编号:", value=sid, key=f"ren_l_{sid}")
-                        if st.button("确认", key=f"rb_l_{sid}"):
-                            ok, msg = rename_sample_logic(current_project, df, sid, ren_sid)
-                            if ok: st.rerun()
-                            else: st.error(msg)
-                    if b2.button("🐑", key=f"cl_{sid}", help="克隆"):
-                        new_r = row.copy(); new_r["样品编号"] = get_new_id(current_project, df)
-                        df = pd.concat([df, pd.DataFrame([new_r])], ignore_index=True); save_project_df(current_project, df); st.rerun()
-                    with b3.popover("🗑️"):
-                        st.warning(f"删除 {sid}？")
-                        if st.button("确认删除", key=f"conf_del_{sid}", type="primary", use_container_width=True):
-                            df = df[df["样品编号"] != sid]; save_project_df(current_project, df)
-                            sf = get_sample_folder(current_project, sid)
-                            if os.path.exists(sf): shutil.rmtree(sf)
+            b1, b2, b3 = st.columns([1, 1, 1])
+            with b1.popover("✏️"):
+                ren_sid = st.text_input("新编号:", value=sid, key=f"ren_{key_p}_{sid}")
+                if st.button("确认", key=f"rb_{key_p}_{sid}"):
+                    ok, msg = rename_sample_logic(current_project, df, sid, ren_sid)
+                    if ok: st.session_state["sel_id"] = ren_sid; st.rerun()
+                    else: st.error(msg)
+            if b2.button("🐑", key=f"cl_{key_p}_{sid}", help="克隆"):
+                bulk_create(current_project, 1, source=row); st.rerun()
+            with b3.popover("🗑️"):
+                st.warning(f"删除 {sid}？")
+                if st.button("确认删除", key=f"conf_del_{key_p}_{sid}", type="primary", use_container_width=True):
+                    bulk_delete(current_project, df, [sid])
+                    st.session_state["sel_id"] = None; st.rerun()
+
+        sel_id = st.session_state.get("sel_id")
+        table_sel = []
+        if view == "📋 表格":
+            with perf.span("render.table", rows=len(page_df), widgets=1):
+                tbl = page_df[["样品编号", "状态", "创建日期", "备注"]].copy()
+                tbl.insert(1, "模块", [" · ".join(contents.get(s, {})) for s in tbl["样品编号"]])
+                f_stats = [man.sample_stats(s) for s in tbl["样品编号"]]
+                tbl["文件"] = [f"{n} · {format_size(b)}" if n else "" for n, b in f_stats]
+                event = st.dataframe(tbl, hide_index=True, use_container_width=True, on_select="rerun",
+                                     selection_mode="multi-row", key=f"tbl_{current_project}_{page}")
+                rows = event.selection.rows if event else []
+                table_sel = page_df.iloc[rows]["样品编号"].tolist()
+                if len(rows) == 1:
+                    row = page_df.iloc[rows[0]]
+                    with st.container(border=True):
+                        a1, a2 = st.columns([3, 2])
+                        if a1.button(f"📄 编辑 {row['样品编号']}", key="tbl_edit", use_container_width=True):
+                            st.session_state["edit_id"] = row["样品编号"]; st.rerun()
+                        with a2: row_actions(row, "t")
+        else:
+            # 每张卡片两个按钮 (编辑、⋯)；选中行的操作按钮另计
+            with perf.span("render.cards", rows=len(page_df), widgets=2 * len(page_df)):
+                for idx, row in page_df.iterrows():
+                    sid = row["样品编号"]
+                    with st.container():
+                        cols = st.columns([2.5, 4, 2.5])
+                        with cols[0]:
+                            if st.button(f"📄 {sid}", key=f"btn_{sid}", use_container_width=True):
+                                st.session_state["edit_id"] = sid; st.rerun()
+                            stt = row["状态"]
+                            color = "orange" if stt == "制备中" else "green" if stt == "完成" else "red"
+                            st.markdown(f":{color}[● {stt}] &nbsp; `{row['创建日期']}`")
+                        with cols[1]:
+                            modules = contents.get(sid, {}).keys()
+                            if modules:
+                                tags_html = "".join([f'<span class="module-tag">{m}</span>' for m in modules])
+                                st.markdown(tags_html, unsafe_allow_html=True)
+                            n_f, size_f = man.sample_stats(sid)
+                            st.caption(f"备注: {row['备注']}" + (f" &nbsp; 📎 {n_f} 个文件 · {format_size(size_f)}" if n_f else ""))
+                        with cols[2]:
+                            if sid == sel_id: row_actions(row, "l")
+                            elif st.button("⋯", key=f"sel_{sid}", help="操作"):
+                                st.session_state["sel_id"] = sid; st.rerun()
+                        st.markdown("<hr style='margin:5px 0; opacity:0.1'>", unsafe_allow_html=True)
+
+        with bulk_box.expander("📦 批量操作", expanded=False):
+            tb1, tb2, tb3 = st.tabs(["➕ 批量新建", "✏️ 批量修改", "🗑️ 批量删除"])
+            with tb1:
+                n1, n2 = st.columns([3, 1])
+                src = n1.selectbox("来源", ["📄 空白"] + [f"📑 {t}" for t in presets] + ["🐑 克隆已有样品"], key="bk_src")
+                n_new = int(n2.number_input("数量", min_value=1, max_value=1000, value=1, step=1, key="bk_n"))
+                clone_sid = st.text_input("克隆源编号", key="bk_clone") if src.startswith("🐑") else ""
+                if st.button(f"➕ 新建 {n_new} 个样品", key="bk_create"):
+                    if src.startswith("🐑"):
+                        hit = df[df["样品编号"] == clone_sid.strip()]
+                        if hit.empty: st.error("克隆源编号不存在")
+                        else: bulk_create(current_project, n_new, source=hit.iloc[0]); st.rerun()
+                    else:
+                        content = template_content(presets[src[2:]]) if src.startswith("📑") else {}
+                        bulk_create(current_project, n_new, content); st.rerun()
+
+            scope_opts = [f"当前筛选结果 ({total} 条)", "手动选择"]
+            for tab, key_p in ((tb2, "bu"), (tb3, "bd")):
+                with tab:
+                    scope = st.radio("作用范围", scope_opts, index=int(bool(table_sel)), horizontal=True, key=f"{key_p}_scope")
+                    if scope == scope_opts[0]: targets = v_df["样品编号"].tolist()
+                    else:
+                        # 选项限定在当前页 (表格视图中勾选的行默认选中)，避免为大项目生成巨大的下拉框
+                        targets = st.multiselect("选择样品", page_df["样品编号"].tolist(), default=table_sel, key=f"{key_p}_sel_{page}")
+                    if key_p == "bu":
+                        u1, u2, u3 = st.columns([1, 2, 1])
+                        n_st = u1.selectbox("状态", ["(不修改)", "制备中", "待测试", "完成", "报废"], key="bu_st")
+                        n_nt = u2.text_input("备注 (留空不修改)", key="bu_nt")
+                        append = u3.checkbox("追加到原备注", key="bu_app")
+                        if st.button(f"✏️ 应用到 {len(targets)} 个样品", key="bu_go", disabled=not targets):
+                            bulk_update(current_project, df, targets, None if n_st == "(不修改)" else n_st, n_nt or None, append)
                             st.rerun()
-                st.markdown("<hr style='margin:5px 0; opacity:0.1'>", unsafe_allow_html=True)
+                    else:
+                        with_files = st.checkbox("同时删除样品文件夹", value=True, key="bd_files")
+                        sure = st.checkbox(f"我确认删除这 {len(targets)} 个样品 (不可恢复文件)", key="bd_sure")
+                        if st.button(f"🗑️ 删除 {len(targets)} 个样品", key="bd_go", disabled=not (targets and sure)):
+                            bulk_delete(current_project, df, targets, with_files)
+                            st.session_state["sel_id"] = None; st.rerun()
 
     else:
         # --- B. 编辑模式 ---
@@ -268,6 +436,7 @@ if current_project:
         try:
             row_idx = df[df["样品编号"] == sid].index[0]
             cur = df.loc[row_idx]; content_json = json.loads(cur["Content_JSON"])
+            if not isinstance(content_json, dict): content_json = {}
         except: st.session_state["edit_id"] = None; st.rerun()
 
         c1, c2, c3 = st.columns([1, 4, 1.5])
@@ -283,7 +452,10 @@ if current_project:
                     else: st.error(msg)
 
         fpath = get_sample_folder(current_project, sid)
-        if c3.button("📂 总目录", use_container_width=True): open_folder(fpath)
+        man = get_file_manifest(current_project)
+        n_f, size_f = man.sample_stats(sid)
+        if c3.button(f"📂 总目录 ({n_f})" if n_f else "📂 总目录", use_container_width=True,
+                     help=f"{n_f} 个文件 · {format_size(size_f)}"): open_folder(fpath)
 
         sc1, sc2, sc3 = st.columns(3)
         n_st = sc1.selectbox("状态", ["制备中", "待测试", "完成", "报废"], index=0)
@@ -302,6 +474,8 @@ if current_project:
             with st.container(border=True):
                 mh0, mh1, mh2, mh3, mh4 = st.columns([0.5, 3, 1, 2, 2])
                 mh0.markdown(f"#### 🧩")
+                n_mf, size_mf = man.module_stats(sid, mod)
+                if n_mf: mh2.caption(f"📎 {n_mf} · {format_size(size_mf)}")
                 new_mod_name = mh1.text_input("模块名", value=mod, key=f"mn_{sid}_{mod}", label_visibility="collapsed")
                 
                 with mh3:
@@ -311,13 +485,13 @@ if current_project:
                         new_order[idx], new_order[idx-1] = new_order[idx-1], new_order[idx]
                         reordered_json = {k: content_json[k] for k in new_order}
                         df.at[row_idx, "Content_JSON"] = json.dumps(reordered_json, ensure_ascii=False)
-                        save_project_df(current_project, df); st.rerun()
+                        save_project_rows(current_project, df.loc[[row_idx]]); st.rerun()
                     if bc2.button("⬇️", key=f"dn_{sid}_{mod}", disabled=(idx == len(mod_keys)-1)):
                         new_order = mod_keys.copy()
                         new_order[idx], new_order[idx+1] = new_order[idx+1], new_order[idx]
                         reordered_json = {k: content_json[k] for k in new_order}
                         df.at[row_idx, "Content_JSON"] = json.dumps(reordered_json, ensure_ascii=False)
-                        save_project_df(current_project, df); st.rerun()
+                        save_project_rows(current_project, df.loc[[row_idx]]); st.rerun()
                
                 if mh4.button("📂 整理", key=f"fold_{sid}_{mod}"): open_folder(mod_sub_fpath)
 
@@ -335,7 +509,7 @@ if current_project:
                                 if mod in content_json and pk in content_json[mod]:
                                     del content_json[mod][pk]
                                 df.at[row_idx, "Content_JSON"] = json.dumps(content_json, ensure_ascii=False)
-                                save_project_df(current_project, df); st.rerun()
+                                save_project_rows(current_project, df.loc[[row_idx]]); st.rerun()
                         updated_p_list.append((r_pk, r_pv))
                     
                     st.divider()
@@ -349,25 +523,22 @@ if current_project:
 
         nm = st.text_input("➕ 添加新模块")
         if st.button("💾 保存所有修改 (SAVE)", type="primary"):
-            for m in del_mods:
-                td = os.path.join(fpath, sanitize_filename(m))
-                if os.path.exists(td): shutil.rmtree(td)
 
             df.at[row_idx, "状态"], df.at[row_idx, "创建日期"], df.at[row_idx, "备注"] = n_st, n_dt, n_nt
             
-            new_cont_serialized = {}
+            new_cont_serialized, fs_moves = {}, []
             for m_new, data in final_json.items():
                 m_old = data["old_name"]
-                curr_m_dir = get_module_folder(current_project, sid, m_old)
                 if m_new != m_old:
-                    gc.collect(); time.sleep(0.1)
-                    new_m_path = os.path.join(fpath, sanitize_filename(m_new))
-                    if os.path.exists(curr_m_dir): shutil.move(curr_m_dir, new_m_path)
-                    curr_m_dir = new_m_path
-                
+                    fs_moves.append((get_module_folder(current_project, sid, m_old), get_module_folder(current_project, sid, m_new)))
                 new_cont_serialized[m_new] = {pair[0]: pair[1] for pair in data["p_list"] if pair[0]}
             
             if nm: new_cont_serialized[nm] = {}
             df.at[row_idx, "Content_JSON"] = json.dumps(new_cont_serialized, ensure_ascii=False)
-            save_project_df(current_project, df); st.toast("✅ 已保存"); time.sleep(0.5); st.rerun()
-else: st.info("👋 请选择项目")
\ No newline at end of file
+            save_project_rows(current_project, df.loc[[row_idx]])
+            for m in del_mods: delete_folder(get_module_folder(current_project, sid, m))
+            for src, dst in fs_moves: move_folder(src, dst)
+            st.toast("✅ 已保存"); time.sleep(0.5); st.rerun()
+else: st.info("👋 请选择项目")
+
+perf.end_run()
@@ -0,0 +1,205 @@
+"""性能基准：在合成项目 (默认 1k/10k/100k 样品) 上测量核心操作的耗时与峰值内存。
+
+    python benchmarks/bench.py                          # 默认规模，结果写入 benchmarks/results/
+    python benchmarks/bench.py --scales 1000 10000 --repeat 3 --folders 0.05
+    python benchmarks/bench.py --compare benchmarks/results/旧结果.json
+
+只依赖核心包 samplemanager，不需要 Streamlit 或图形界面。数据写在临时目录，结束后删除。
+耗时取多次运行的中位数；peak_alloc_kb 为单次操作期间 tracemalloc 记录的额外内存峰值 (单独一次运行，不计入耗时)。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from statistics import mean, median
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synth
+from samplemanager import config
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+REGRESSION_RATIO = 1.2  # 与旧结果比较时，中位数耗时超过该倍数即标记为退化
+
+
+def search_queries(project_name):
+    return {"free_text": "退火后", "id": f"{project_name}-123", "module": "module:XRD_Test",
+            "field": "temperature:700", "multi": "完成 module:Deposition 对照组"}
+
+
+def measure(fn, setup=None, repeat=5):
+    """返回 (每次耗时秒数列表, 峰值额外内存字节)。setup 在每次运行前调用，不计时。"""
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t0)
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    return times, peak
+
+
+def wait_fs_queue(timeout=60):
+    from samplemanager.jobs import get_fs_queue
+    deadline = time.time() + timeout
+    while get_fs_queue().active() and time.time() < deadline: time.sleep(0.01)
+
+
+def get_project_entry_reset(name, key):
+    """清掉缓存中的懒构建结构 (搜索索引/参数表)，用于测量首次构建耗时。"""
+    from samplemanager.projects import get_project_entry
+    get_project_entry(name)[key] = None
+
+
+def bench_scale(n, repeat=5, folders=0.0, seed=0, log=print):
+    """生成 n 个样品的项目并测量各操作，返回 {操作名: 统计}。"""
+    from samplemanager.backup import get_backup_engine
+    from samplemanager.files import get_file_manifest
+    from samplemanager.projects import (drop_project_cache, get_param_table, get_search_index, load_project_df, save_project_df,
+                                        save_project_rows, search_samples)
+    from samplemanager.samples import SORT_OPTIONS, bulk_create, get_new_id, rename_sample_logic, sort_samples
+
+    name = f"Bench_{n}"
+    t0 = time.perf_counter()
+    synth.generate(name, n, synth.load_templates(), folders, seed)
+    log(f"  生成 {n} 个样品: {time.perf_counter() - t0:.1f}s")
+    state = {"i": 0}
+
+    def fresh_df():
+        return load_project_df(name)
+
+    def touched_df():
+        # 模拟编辑一个样品后保存：每次改不同的行
+        df = load_project_df(name)
+        state["i"] += 1
+        df.iat[state["i"] % len(df), 3] = f"bench edit {state['i']}"
+        return df
+
+    def renamed_pair():
+        df = load_project_df(name)
+        state["i"] += 1
+        return df, df.iat[state["i"] % len(df), 0]
+
+    ops = {
+        "load_cold": (lambda _: load_project_df(name), lambda: drop_project_cache(name)),
+        "load_warm": (lambda _: load_project_df(name), None),
+        "save_one_row": (lambda df: save_project_rows(name, df.iloc[[state["i"] % len(df)]]), touched_df),
+        "save_full_df": (lambda df: save_project_df(name, df), touched_df),
+        "search_index_build": (lambda _: get_search_index(name), lambda: get_project_entry_reset(name, "index")),
+        "param_table_build": (lambda _: get_param_table(name), lambda: get_project_entry_reset(name, "params")),
+    }
+    get_search_index(name)
+    hits = {f"search_{q_name}": len(search_samples(name, q)) for q_name, q in search_queries(name).items()}
+    # 没有命中的查询在第一个条件后就结束，计时没有意义
+    for op, k in hits.items():
+        if not k: log(f"  ⚠️ {op} 没有命中任何样品")
+    for q_name, q in search_queries(name).items():
+        ops[f"search_{q_name}"] = (lambda df, q=q: df[df["样品编号"].isin(search_samples(name, q))], fresh_df)
+    for i, opt in enumerate(SORT_OPTIONS):
+        ops[f"sort_{i}"] = (lambda df, opt=opt: sort_samples(df, opt), fresh_df)
+    ops.update({
+        "get_new_id": (lambda _: get_new_id(name), None),
+        "clone": (lambda df: bulk_create(name, 1, source=df.iloc[0]), fresh_df),
+        "rename": (lambda a: (rename_sample_logic(name, a[0], a[1], f"{a[1]}_r"), wait_fs_queue()), renamed_pair),
+        "backup_snapshot": (lambda df: get_backup_engine().snapshot(name, df), touched_df),
+    })
+    if folders: ops["manifest_rescan"] = (lambda _: get_file_manifest(name, rescan=True), None)
+
+    results = {}
+    for op, (fn, setup) in ops.items():
+        times, peak = measure(fn, setup, repeat)
+        results[op] = {"median_ms": round(median(times) * 1000, 3), "min_ms": round(min(times) * 1000, 3),
+                       "mean_ms": round(mean(times) * 1000, 3), "runs": len(times), "peak_alloc_kb": round(peak / 1024, 1)}
+        log(f"  {op:<20} {results[op]['median_ms']:>10.2f} ms  峰值 {results[op]['peak_alloc_kb']:>10.0f} KB")
+    results["_labels"] = {f"sort_{i}": opt for i, opt in enumerate(SORT_OPTIONS)}
+    results["_hits"] = hits
+    return results
+
+
+def max_rss_mb():
+    try: import resource
+    except ImportError: return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except Exception: return None
+
+
+def compare(new, old_path):
+    """打印与旧结果的中位数耗时对比，返回退化的操作数。"""
+    with open(old_path, "r", encoding="utf-8") as f: old = json.load(f)
+    print(f"\n对比 {old_path} (commit {old['meta'].get('commit')}) -> commit {new['meta'].get('commit')}")
+    regressions = 0
+    for scale, ops in new["results"].items():
+        for op, r in ops.items():
+            o = old["results"].get(scale, {}).get(op)
+            if op.startswith("_") or not o or not o["median_ms"]: continue
+            ratio = r["median_ms"] / o["median_ms"]
+            flag = "⚠️ 退化" if ratio > REGRESSION_RATIO else ""
+            regressions += bool(flag)
+            print(f"  {scale:>7} {op:<20} {o['median_ms']:>10.2f} -> {r['median_ms']:>10.2f} ms  x{ratio:.2f} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="SampleManager 性能基准")
+    p.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="项目样品数 (默认 1000 10000 100000)")
+    p.add_argument("--repeat", type=int, default=5, help="每个操作的计时次数")
+    p.add_argument("--folders", type=float, default=0.0, help="创建样品文件夹的样品比例 (0~1)，>0 时同时测量文件清单扫描")
+    p.add_argument("--storage", choices=["sqlite", "csv"], default=config.STORAGE_BACKEND)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", help="结果 JSON 路径 (默认 benchmarks/results/<时间>_<commit>_<存储>.json)")
+    p.add_argument("--compare", help="与之前的结果 JSON 比较")
+    p.add_argument("--keep", action="store_true", help="保留临时数据目录")
+    args = p.parse_args(argv)
+
+    base = tempfile.mkdtemp(prefix="sm_bench_")
+    config.set_base_dir(base)
+    config.STORAGE_BACKEND = args.storage
+    config.BACKUP_DEBOUNCE = 10 ** 6  # 后台备份不参与计时，backup_snapshot 单独测量
+    meta = {"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+            "storage": args.storage, "repeat": args.repeat, "folders": args.folders, "seed": args.seed,
+            "python": platform.python_version(), "pandas": pd.__version__, "platform": platform.platform()}
+    results = {}
+    try:
+        for n in args.scales:
+            print(f"[{n} 个样品]")
+            results[str(n)] = bench_scale(n, args.repeat, args.folders, args.seed)
+    finally:
+        from samplemanager.backup import get_backup_engine
+        get_backup_engine().pending.clear()
+        if args.keep: print(f"数据目录: {base}")
+        else: shutil.rmtree(base, ignore_errors=True)
+    meta["max_rss_mb"] = max_rss_mb()
+    out = {"meta": meta, "results": results}
+
+    path = args.out or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{meta['commit'] or 'nogit'}_{args.storage}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f: json.dump(out, f, ensure_ascii=False, indent=2)
+    print(f"✅ 结果已保存: {path} (进程峰值内存 {meta['max_rss_mb']} MB)")
+    if args.compare: return 1 if compare(out, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,29 @@
+"""SampleManager 核心库：项目、样品、模板、备份与文件夹操作，不依赖 Streamlit。
+
+Web 界面 (SampleManager.py) 与命令行 (python -m samplemanager) 共用这套代码。
+子模块按需加载，`import samplemanager` 本身不会导入 pandas 等重依赖。
+"""
+import importlib
+
+__version__ = "3.0"
+
+_EXPORTS = {
+    "load_project_df": "projects", "load_project_content": "projects", "save_project_df": "projects",
+    "save_project_rows": "projects", "get_search_index": "projects", "search_samples": "projects", "get_param_table": "projects", "rename_project": "projects",
+    "delete_project": "projects", "get_storage": "storage", "get_backup_engine": "backup",
+    "load_presets": "presets", "save_presets": "presets", "filter_by_params": "params",
+    "allocate_ids": "samples", "get_new_id": "samples", "bulk_create": "samples", "bulk_update": "samples",
+    "bulk_delete": "samples", "rename_sample_logic": "samples", "sort_samples": "samples", "get_file_manifest": "files",
+    "move_folder": "jobs", "delete_folder": "jobs", "export_excel": "export", "export_parquet": "export",
+    "import_table": "importer",
+}
+
+__all__ = list(_EXPORTS) + ["config"]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    if name == "config":
+        return importlib.import_module(".config", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
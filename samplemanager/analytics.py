@@ -0,0 +1,154 @@
+"""跨项目分析：按项目懒加载参数长表，向量化地做分组聚合 (计数/均值/最值)、状态分布与时间序列。
+
+每个项目先算出可相加的中间结果 (n/count/sum/min/max)，按项目指纹缓存，再跨项目合并；
+新增或修改一个项目只重算该项目，其余项目直接复用缓存。
+"""
+import threading
+
+import pandas as pd
+
+from . import perf
+from .projects import get_param_table, get_project_entry
+from .storage import get_storage
+
+GROUP_KEYS = ["project", "状态", "period"]  # 另可按参数分组: ("x", 模块, 参数)
+FREQS = {"D": "日", "W": "周", "M": "月", "Q": "季度", "Y": "年"}
+MAX_PARTIALS = 64  # 每个项目缓存的查询结果数
+
+_frames = {}    # 项目 -> {"sig", "params", "samples"}
+_partials = {}  # 项目 -> {"sig", "results": {查询键: 中间结果}}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def get_stats(): return dict(_stats, projects=len(_frames))
+
+def list_all_projects(): return sorted(get_storage().list_projects())
+
+def project_frames(project):
+    """项目的分析表 (参数长表 + 状态/日期，以及样品表)，按存储指纹缓存；项目不存在时返回 None。"""
+    entry = get_project_entry(project)
+    if entry is None:
+        with _lock: _frames.pop(project, None); _partials.pop(project, None)
+        return None
+    cached = _frames.get(project)
+    if cached and cached["sig"] == entry["sig"]: return cached
+    with perf.span("analytics.frame", project=project) as sp:
+        samples = entry["df"][["样品编号", "状态", "创建日期"]].drop_duplicates("样品编号", keep="last")
+        samples = samples.assign(date=pd.to_datetime(samples["创建日期"], errors="coerce", format="ISO8601"))
+        params = get_param_table(project).merge(samples, on="样品编号", how="left")
+        sp.set(rows=len(params))
+    frames = {"sig": entry["sig"], "params": params, "samples": samples}
+    with _lock: _frames[project] = frames
+    return frames
+
+def _cached(project, key, build):
+    """取项目的中间结果：指纹未变时直接返回缓存，否则调用 build(frames) 重算。"""
+    frames = project_frames(project)
+    if frames is None: return None
+    with _lock:
+        slot = _partials.get(project)
+        if slot is None or slot["sig"] != frames["sig"]: slot = _partials[project] = {"sig": frames["sig"], "results": {}}
+        hit = slot["results"].get(key)
+    if hit is not None:
+        _stats["hits"] += 1
+        return hit
+    _stats["misses"] += 1
+    with perf.span("analytics.partial", project=project, query=str(key[0])):
+        res = build(frames)
+    with _lock:
+        slot["results"][key] = res
+        while len(slot["results"]) > MAX_PARTIALS: slot["results"].pop(next(iter(slot["results"])))
+    return res
+
+def _select(frames, module, param):
+    """参数 param (module 为 "*" 表示任意模块) 的非空取值行；param 为 None 时返回样品表 (无数值)。"""
+    if param is None: return frames["samples"].assign(num=float("nan"))
+    t = frames["params"]
+    mask = (t["param"] == param) & (t["value"].str.strip() != "")
+    if module != "*": mask &= t["module"] == module
+    return t[mask.to_numpy()]
+
+def _x_values(frames, x):
+    """按另一参数分组时每个样品的取值：全部能解析为数值时用数值，否则用原文 (避免混合类型无法排序)。"""
+    sel = _select(frames, x[1], x[2]).drop_duplicates("样品编号")
+    vals = sel["num"] if sel["num"].notna().all() else sel["value"].str.strip()
+    return pd.Series(vals.to_numpy(), index=sel["样品编号"].to_numpy())
+
+def _group_name(b):
+    """分组项对应的结果列名。"""
+    if isinstance(b, tuple): return f"{b[1]}.{b[2]}"
+    return {"period": "时间"}.get(b, b)
+
+def _group_columns(frames, sel, by, freq):
+    cols = {}
+    for b in by:
+        if b == "状态": cols["状态"] = sel["状态"]
+        elif b == "period": cols["时间"] = sel["date"].dt.to_period(freq).dt.start_time
+        elif isinstance(b, tuple) and b[0] == "x": cols[_group_name(b)] = sel["样品编号"].map(_x_values(frames, b))
+    return cols
+
+def _partial_agg(module, param, by, freq):
+    def build(frames):
+        sel = _select(frames, module, param)
+        cols = _group_columns(frames, sel, by, freq)
+        keys = pd.DataFrame(cols, index=sel.index) if cols else pd.DataFrame({"_all": 0}, index=sel.index)
+        g = sel["num"].groupby([keys[c] for c in keys.columns], dropna=True, observed=True)
+        part = pd.DataFrame({"n": g.size(), "count": g.count(), "sum": g.sum(), "min": g.min(), "max": g.max()})
+        return part.reset_index().drop(columns="_all", errors="ignore")
+    return build
+
+def aggregate(projects=None, module="*", param=None, by=("project",), freq="M"):
+    """跨项目聚合参数值：by 取自 "project"/"状态"/"period" 或 ("x", 模块, 参数)。
+
+    返回列: 分组列…, n (取值行数；param 为 None 时为样品数), count (数值个数), mean, min, max。
+    """
+    by = tuple(by)
+    inner = tuple(b for b in by if b != "project")
+    key = ("agg", module, param, inner, freq)
+    parts = []
+    for p in (projects if projects is not None else list_all_projects()):
+        part = _cached(p, key, _partial_agg(module, param, inner, freq))
+        if part is not None and len(part): parts.append(part.assign(project=p))
+    # 列名由 by 决定，没有任何可分组的行 (如日期全部无法解析) 时也返回带这些列的空表
+    names = (["project"] if "project" in by else []) + [_group_name(b) for b in inner]
+    if not parts: return pd.DataFrame(columns=names + ["n", "count", "mean", "min", "max"])
+    allp = pd.concat(parts, ignore_index=True)
+    if names: res = allp.groupby(names, dropna=True, observed=True).agg(n=("n", "sum"), count=("count", "sum"), sum=("sum", "sum"),
+                                                                          min=("min", "min"), max=("max", "max")).reset_index()
+    else: res = pd.DataFrame([{"n": allp["n"].sum(), "count": allp["count"].sum(), "sum": allp["sum"].sum(),
+                                "min": allp["min"].min(), "max": allp["max"].max()}])
+    res["mean"] = res["sum"] / res["count"].where(res["count"] > 0)
+    return res[names + ["n", "count", "mean", "min", "max"]]
+
+def status_distribution(projects=None, module="*", param=None):
+    """各项目的状态分布 (行: 项目，列: 状态，值: 样品数)；给定 param 时只统计有该参数的样品。"""
+    def build(frames):
+        sel = _select(frames, module, param).drop_duplicates("样品编号")
+        return sel["状态"].value_counts()
+    counts = {}
+    for p in (projects if projects is not None else list_all_projects()):
+        vc = _cached(p, ("status", module, param), build)
+        if vc is not None: counts[p] = vc
+    if not counts: return pd.DataFrame()
+    return pd.DataFrame(counts).T.fillna(0).astype(int)
+
+def time_series(projects=None, module="*", param=None, freq="M", per_project=False):
+    """按创建日期分期的聚合：param 为 None 时统计每期新建的样品数；无法解析的日期不计入。"""
+    res = aggregate(projects, module, param, (("project",) if per_project else ()) + ("period",), freq)
+    return res.sort_values("时间")
+
+def list_params(projects=None):
+    """所有项目中出现过的 (模块, 参数)：非空取值数、数值个数、出现的项目数。"""
+    def build(frames):
+        t = frames["params"]
+        t = t[(t["value"].str.strip() != "").to_numpy()]
+        g = t.groupby(["module", "param"], observed=True)["num"]
+        return pd.DataFrame({"n": g.size(), "count": g.count()}).reset_index()
+    parts = []
+    for p in (projects if projects is not None else list_all_projects()):
+        part = _cached(p, ("params",), build)
+        if part is not None and len(part): parts.append(part)
+    if not parts: return pd.DataFrame(columns=["module", "param", "n", "count", "projects"])
+    allp = pd.concat(parts, ignore_index=True)
+    return (allp.groupby(["module", "param"]).agg(n=("n", "sum"), count=("count", "sum"), projects=("n", "size"))
+            .reset_index().sort_values(["module", "param"], ignore_index=True))
@@ -0,0 +1,145 @@
+"""备份：内容寻址 (sha256 + gzip) 去重，后台线程去抖写入，加载路径零备份 I/O。"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from . import config, perf
+
+class BackupEngine:
+    def __init__(self, root, debounce=None):
+        self.root = root
+        self.debounce = config.BACKUP_DEBOUNCE if debounce is None else debounce
+        self.objects = os.path.join(root, "objects")
+        self.index_file = os.path.join(root, "index.jsonl")
+        os.makedirs(self.objects, exist_ok=True)
+        self.lock, self.wake = threading.Lock(), threading.Event()
+        self.pending = {}  # project -> (到期时间, DataFrame)
+        self.index = []    # [{"project", "ts", "hash", "rows", "size"}]，按时间追加
+        self.errors = {}   # project -> {"ts", "error"}：后台写入失败的最近一次，成功后清除，由界面显示
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try: self.index.append(json.loads(line))
+                    except: pass
+        self.last_prune = 0.0
+        threading.Thread(target=self._run, name="backup-engine", daemon=True).start()
+
+    def schedule(self, project, df):
+        """登记一次待备份快照；同一项目在去抖窗口内的多次保存只写最后一次。
+
+        到期时间从窗口内第一次保存算起，不随后续保存顺延，连续保存时也至少每 debounce 秒写一次。
+        """
+        with self.lock:
+            due = self.pending[project][0] if project in self.pending else time.time() + self.debounce
+            self.pending[project] = (due, df)
+        self.wake.set()
+
+    def has_versions(self, project):
+        return any(e["project"] == project for e in self.index)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                due = min((t for t, _ in self.pending.values()), default=None)
+            self.wake.wait(None if due is None else max(0.0, due - time.time()))
+            self.wake.clear()
+            self.flush(only_due=True)
+
+    def flush(self, project=None, only_due=False):
+        now = time.time()
+        with self.lock:
+            ready = [p for p, (t, _) in self.pending.items()
+                     if (project is None or p == project) and (not only_due or t <= now)]
+            jobs = [(p, self.pending.pop(p)[1]) for p in ready]
+        for p, df in jobs:
+            try: self.snapshot(p, df)
+            except Exception as e:
+                err = {"ts": datetime.now().isoformat(timespec="seconds"), "error": f"{type(e).__name__}: {e}"}
+                with self.lock: self.errors[p] = err
+            else:
+                with self.lock: self.errors.pop(p, None)
+        if jobs and now - self.last_prune > 3600:
+            self.prune(); self.last_prune = now
+
+    def _blob(self, h): return os.path.join(self.objects, h[:2], f"{h}.csv.gz")
+
+    def snapshot(self, project, df):
+        with perf.span("backup.snapshot", project=project, rows=len(df)) as sp:
+            data = df.to_csv(index=False).encode("utf-8")
+            h = hashlib.sha256(data).hexdigest()
+            latest = next((e for e in reversed(self.index) if e["project"] == project), None)
+            if latest and latest["hash"] == h: return None
+            blob = self._blob(h)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                with gzip.open(blob + ".tmp", "wb") as f: f.write(data)
+                os.replace(blob + ".tmp", blob)
+                sp.set(bytes=os.path.getsize(blob))
+        entry = {"project": project, "ts": datetime.now().isoformat(timespec="seconds"),
+                 "hash": h, "rows": len(df), "size": len(data)}
+        with self.lock:
+            self.index.append(entry)
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def versions(self, project):
+        return [e for e in self.index if e["project"] == project]
+
+    def restore(self, project, when):
+        """返回项目在 when (datetime 或 ISO 字符串) 时刻及之前最近一个版本的 DataFrame。"""
+        when = when if isinstance(when, str) else when.isoformat(timespec="seconds")
+        cands = [e for e in self.versions(project) if e["ts"] <= when]
+        if not cands: return None
+        with gzip.open(self._blob(cands[-1]["hash"]), "rb") as f:
+            df = pd.read_csv(f, dtype=str, keep_default_na=False)
+        return df.fillna("").astype(str)
+
+    def prune(self, now=None):
+        """保留策略：24 小时内每小时一份，30 天内每天一份，52 周内每周一份，其余删除。"""
+        now = now or datetime.now()
+        with self.lock:
+            keep, seen, projects = [], set(), set()
+            for e in reversed(self.index):
+                ts = datetime.fromisoformat(e["ts"])
+                age = (now - ts).total_seconds() / 3600
+                if age <= config.BACKUP_RETENTION["hourly"]: bucket = ts.strftime("%Y-%m-%d %H")
+                elif age <= config.BACKUP_RETENTION["daily"] * 24: bucket = ts.strftime("%Y-%m-%d")
+                elif age <= config.BACKUP_RETENTION["weekly"] * 24 * 7: bucket = "W%d-%02d" % ts.isocalendar()[:2]
+                else: bucket = None
+                # 每个桶保留最新的一份；每个项目最新的版本总是保留
+                if e["project"] in projects and (bucket is None or (e["project"], bucket) in seen): continue
+                projects.add(e["project"]); seen.add((e["project"], bucket)); keep.append(e)
+            self.index = keep[::-1]
+            tmp = self.index_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for e in self.index: f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.index_file)
+        live = {e["hash"] for e in self.index}
+        for d in os.scandir(self.objects):
+            if not d.is_dir(): continue
+            for b in os.scandir(d.path):
+                if b.name.endswith(".csv.gz") and b.name[:-7] not in live:
+                    try: os.remove(b.path)
+                    except OSError: pass
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_backup_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = BackupEngine(config.BACKUP_DIR)
+            atexit.register(_engine.flush)
+        return _engine
+
+def execute_backup(project_name, df):
+    get_backup_engine().schedule(project_name, df)
@@ -0,0 +1,132 @@
+"""命令行入口：python -m samplemanager <命令> ...
+
+重依赖在各命令内部导入，`--help` 等无需加载 pandas。
+"""
+import argparse
+import os
+import sys
+
+from . import config
+
+
+def cmd_list(args):
+    from .projects import load_project_df
+    from .storage import get_storage
+    for name in sorted(get_storage().list_projects()):
+        df = load_project_df(name)
+        counts = df["状态"].value_counts()
+        print(f"{name}\t{len(df)} 个样品\t" + " ".join(f"{k}:{v}" for k, v in counts.items()))
+
+
+def cmd_import(args):
+    from .importer import import_table
+    from .storage import get_storage
+    if not os.path.exists(args.file): return f"文件不存在: {args.file}"
+    if not args.create and not get_storage().exists(args.project):
+        return f"项目不存在: {args.project} (使用 --create 新建)"
+    stats = import_table(args.project, args.file, module=args.module, chunksize=args.chunksize, sheet=args.sheet, sep=args.sep)
+    print(f"✅ 导入完成：新建 {stats['created']}，更新 {stats['updated']}")
+
+
+def cmd_export(args):
+    from .storage import get_storage
+    if not get_storage().exists(args.project): return f"项目不存在: {args.project}"
+    ext = os.path.splitext(args.out)[1].lower()
+    if ext == ".xlsx":
+        from .export import export_excel
+        export_excel(args.project, args.out)
+    elif ext == ".parquet":
+        from .export import export_parquet
+        export_parquet(args.project, args.out)
+    elif ext == ".csv": get_storage().export_csv(args.project, args.out)
+    else: return f"不支持的导出格式: {ext or '(无扩展名)'} (支持 .csv / .xlsx / .parquet)"
+    print(f"✅ 已导出: {args.out}")
+
+
+def cmd_migrate(args):
+    from .storage import SqliteStorage
+    config.ensure_dirs()
+    storage = SqliteStorage(config.DB_FILE)
+    names = storage.migrate_csv()
+    print(f"✅ 已迁移 {len(names)} 个 CSV 项目到 {config.DB_FILE}" + (f": {', '.join(names)}" if names else ""))
+    for name, msg in storage.migration_issues.items(): print(f"⚠️ {name}.csv: {msg}")
+
+
+def cmd_backup(args):
+    from .backup import get_backup_engine
+    from .projects import load_project_df
+    from .storage import get_storage
+    names = args.projects or get_storage().list_projects()
+    engine = get_backup_engine()
+    for name in names:
+        if not get_storage().exists(name): return f"项目不存在: {name}"
+        e = engine.snapshot(name, load_project_df(name))
+        print(f"{name}\t" + (f"新版本 {e['ts']} ({e['rows']} 行)" if e else "无变化"))
+
+
+def cmd_versions(args):
+    from .backup import get_backup_engine
+    for e in get_backup_engine().versions(args.project):
+        print(f"{e['ts']}\t{e['rows']} 行\t{e['hash'][:12]}")
+
+
+def cmd_restore(args):
+    from .backup import get_backup_engine
+    from .projects import save_project_df
+    engine = get_backup_engine()
+    engine.flush(args.project)
+    df = engine.restore(args.project, args.when)
+    if df is None: return f"{args.project} 在 {args.when} 之前没有备份版本"
+    if args.dry_run: print(f"将恢复 {len(df)} 行 (未写入)"); return
+    save_project_df(args.project, df)
+    print(f"✅ 已恢复 {args.project} 到 {args.when} 之前的最近版本 ({len(df)} 行)")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="samplemanager", description="SampleManager 命令行工具")
+    p.add_argument("--base-dir", help=f"数据目录 (默认 {config.BASE_DIR}，也可用环境变量 SM_BASE_DIR)")
+    p.add_argument("--storage", choices=["sqlite", "csv"], help="存储后端 (默认 sqlite)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="列出项目及样品数").set_defaults(func=cmd_list)
+
+    s = sub.add_parser("import", help="从 CSV/TSV/Excel 批量导入样品")
+    s.add_argument("project"); s.add_argument("file")
+    s.add_argument("--module", default="Import", help="无 '模块.参数' 前缀的列归入的模块 (默认 Import)")
+    s.add_argument("--chunksize", type=int, default=5000, help="每块读取的行数")
+    s.add_argument("--sheet", help="Excel 工作表名 (默认第一个)")
+    s.add_argument("--sep", help="CSV 分隔符 (默认按扩展名: .tsv/.txt 为制表符，否则逗号)")
+    s.add_argument("--create", action="store_true", help="项目不存在时新建")
+    s.set_defaults(func=cmd_import)
+
+    s = sub.add_parser("export", help="导出项目，格式由扩展名决定 (.csv/.xlsx/.parquet)")
+    s.add_argument("project"); s.add_argument("out")
+    s.set_defaults(func=cmd_export)
+
+    sub.add_parser("migrate", help="把旧版 CSV 项目导入 SQLite").set_defaults(func=cmd_migrate)
+
+    s = sub.add_parser("backup", help="立即为项目生成备份版本 (默认全部项目)")
+    s.add_argument("projects", nargs="*")
+    s.set_defaults(func=cmd_backup)
+
+    s = sub.add_parser("versions", help="列出项目的备份版本")
+    s.add_argument("project")
+    s.set_defaults(func=cmd_versions)
+
+    s = sub.add_parser("restore", help="恢复项目到某时刻之前最近的备份版本")
+    s.add_argument("project"); s.add_argument("when", help="ISO 时间，如 2024-05-01T12:00:00")
+    s.add_argument("--dry-run", action="store_true")
+    s.set_defaults(func=cmd_restore)
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.base_dir: config.set_base_dir(args.base_dir)
+    if args.storage: config.STORAGE_BACKEND = args.storage
+    try: err = args.func(args)
+    except ImportError as e: err = f"缺少依赖: {e.name}，请先 pip install {e.name}"
+    if err:
+        print(f"❌ {err}", file=sys.stderr)
+        return 1
+    return 0
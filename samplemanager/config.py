@@ -0,0 +1,36 @@
+"""全局配置：数据目录与各项参数。其他模块通过 config.XXX 读取，set_base_dir 后立即生效。"""
+import os
+
+BASE_DIR = "Sample_System_V3.0"
+# 存储后端: "sqlite" (默认) 或 "csv"，可用环境变量 SM_STORAGE 切换
+STORAGE_BACKEND = os.environ.get("SM_STORAGE", "sqlite").lower()
+BACKUP_DEBOUNCE = 30  # 秒；窗口内的连续保存合并为一个备份版本，从第一次保存起算
+BACKUP_RETENTION = {"hourly": 24, "daily": 30, "weekly": 52}  # 小时数 / 天数 / 周数
+MANIFEST_TTL = 60  # 秒；文件清单的自动重扫间隔
+FS_WORKERS, FS_RETRIES = 2, 8  # 文件夹任务线程数；遇到 Windows 文件锁时的重试次数
+# 性能计时：默认关闭 (侧边栏可开启，或设置环境变量 SM_PERF=1)；日志超过大小后轮转，保留若干旧文件
+PERF_ENABLED = os.environ.get("SM_PERF", "0") not in ("", "0")
+PERF_HISTORY = 50  # 内存中保留的最近重跑记录数
+PERF_LOG_MAX_BYTES, PERF_LOG_BACKUPS = 2 * 1024 * 1024, 3
+
+
+def set_base_dir(base_dir):
+    global BASE_DIR, PROJECTS_DIR, BACKUP_DIR, CONFIG_FILE, DB_FILE, EXPORT_DIR, MANIFEST_DIR, FS_JOURNAL, PERF_LOG
+    BASE_DIR = base_dir
+    PROJECTS_DIR = os.path.normpath(os.path.join(BASE_DIR, "Projects"))
+    BACKUP_DIR = os.path.normpath(os.path.join(BASE_DIR, "Backups"))
+    CONFIG_FILE = os.path.normpath(os.path.join(BASE_DIR, "presets.json"))
+    DB_FILE = os.path.normpath(os.path.join(BASE_DIR, "samples.db"))
+    EXPORT_DIR = os.path.normpath(os.path.join(BASE_DIR, "Exports"))
+    MANIFEST_DIR = os.path.normpath(os.path.join(BASE_DIR, "Manifests"))
+    FS_JOURNAL = os.path.normpath(os.path.join(BASE_DIR, "fs_jobs.json"))
+    PERF_LOG = os.path.normpath(os.path.join(BASE_DIR, "perf.jsonl"))
+
+
+def ensure_dirs():
+    for path in [BASE_DIR, PROJECTS_DIR, BACKUP_DIR, EXPORT_DIR]:
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+
+set_base_dir(os.environ.get("SM_BASE_DIR", BASE_DIR))
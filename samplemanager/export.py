@@ -0,0 +1,66 @@
+"""导出：Excel (每个模块一张宽表 + 汇总表，xlsxwriter 常量内存模式) / Parquet (带数值列的长表)。
+
+xlsxwriter 与 pyarrow 在函数内按需导入。
+"""
+import math
+import re
+
+import pandas as pd
+
+from .projects import get_param_table, load_project_content, load_project_df
+from .storage import COLUMNS
+
+def _sheet_name(name, used):
+    base = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet"
+    cand, i = base, 2
+    while cand.lower() in used: cand = f"{base[:28]}~{i}"; i += 1
+    used.add(cand.lower())
+    return cand
+
+def export_excel(project_name, path):
+    """逐行写入磁盘上的 xlsx，内存占用与样品数无关 (参数长表除外)。返回 path。"""
+    import xlsxwriter
+    df = load_project_df(project_name)
+    contents, table = load_project_content(project_name), get_param_table(project_name)
+    # 样品编号/备注/参数名都是用户输入："=..." 不能变成公式，网址也不转换为超链接
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_numbers": False,
+                                    "strings_to_formulas": False, "strings_to_urls": False})
+    head = wb.add_format({"bold": True, "bg_color": "#e3f2fd"})
+    used = set()
+    ws = wb.add_worksheet(_sheet_name("汇总", used))
+    ws.write_row(0, 0, COLUMNS[:4] + ["模块", "参数数"], head)
+    for r, (sid, dt, stt, nt) in enumerate(df[COLUMNS[:4]].itertuples(index=False, name=None), start=1):
+        content = contents.get(sid, {})
+        for c, v in enumerate([sid, dt, stt, nt, " · ".join(content)]): ws.write_string(r, c, v)
+        ws.write_number(r, 5, sum(len(v) for v in content.values() if isinstance(v, dict)))
+    order = {sid: i for i, sid in enumerate(df["样品编号"])}
+    for mod, sub in table.groupby("module", sort=False):
+        sub = sub.drop_duplicates(["样品编号", "param"], keep="last")
+        params = list(pd.unique(sub["param"]))
+        wide = sub.pivot(index="样品编号", columns="param", values="value").reindex(columns=params)
+        wide = wide.loc[sorted(wide.index, key=lambda s: order.get(s, len(order)))]
+        nums = wide.apply(pd.to_numeric, errors="coerce")
+        ws = wb.add_worksheet(_sheet_name(mod, used))
+        ws.write_row(0, 0, ["样品编号"] + params, head)
+        for r, (sid, vals, nvals) in enumerate(zip(wide.index, wide.itertuples(index=False, name=None),
+                                                   nums.itertuples(index=False, name=None)), start=1):
+            ws.write_string(r, 0, sid)
+            for c, (v, n) in enumerate(zip(vals, nvals), start=1):
+                if n is not None and math.isfinite(n): ws.write_number(r, c, n)  # NaN/inf ("1e400" 等) 按原文写入
+                elif isinstance(v, str) and v: ws.write_string(r, c, v)
+    wb.close()
+    return path
+
+def export_parquet(project_name, path, chunk_rows=100_000):
+    """导出参数长表 (含数值列 num 与单位) 及样品日期/状态，分块写入 row group。需要 pyarrow。"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    df = load_project_df(project_name)
+    table = get_param_table(project_name).merge(df[COLUMNS[:4]], on="样品编号", how="left")
+    table = table[["样品编号", "创建日期", "状态", "module", "param", "value", "num", "unit"]]
+    schema = pa.schema([(c, pa.float64() if c == "num" else pa.string()) for c in table.columns])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for i in range(0, max(len(table), 1), chunk_rows):
+            chunk = table.iloc[i:i + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return path
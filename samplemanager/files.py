@@ -0,0 +1,132 @@
+"""文件清单：{项目}_Files/{样品}/{模块}/... 的 (路径, 大小, mtime, 可选哈希) 索引。"""
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+
+from . import config
+from .paths import get_project_folder, sanitize_filename
+
+def open_folder(path):
+    # 目录只在用户点击打开时才创建，渲染时不再有 makedirs 副作用
+    if os.name == "nt":
+        os.makedirs(path, exist_ok=True)
+        subprocess.Popen(f'explorer "{path}"')
+
+def format_size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB": return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+class FileManifest:
+    """用 os.scandir 增量扫描项目文件夹；目录 mtime 未变时沿用上次的文件列表，只对子目录做 stat。
+
+    注意：原地改写文件不会改变目录 mtime，此类变化要到目录内有增删时才会被发现。
+    清单由所有会话共享：扫描在 lock 内把新的 dirs/summary 建在一边再整体替换，读取方不加锁，遍历的字典不会被修改。
+    """
+
+    def __init__(self, root, path, hash_files=False):
+        self.root, self.path, self.hash_files = root, path, hash_files
+        self.lock = threading.Lock()
+        self.dirs = {}  # 相对路径 -> {"mtime", "files": {名: [size, mtime, hash]}, "subdirs": [名]}
+        self.scanned_at = 0.0
+        self.summary = {}  # sid -> {模块: [文件数, 字节数]}，样品目录下的散文件记在模块 "" 下
+        try:
+            with open(path, "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("root") == root: self.dirs = data["dirs"]
+        except: pass
+
+    @staticmethod
+    def _hash(path):
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""): h.update(chunk)
+        return h.hexdigest()
+
+    def _scan_dir(self, rel, dirs, stats):
+        full = os.path.join(self.root, rel) if rel else self.root
+        try: mtime = os.stat(full).st_mtime_ns
+        except OSError: return
+        old = self.dirs.get(rel)
+        if old is not None and old["mtime"] == mtime:
+            stats["skipped"] += 1
+            dirs[rel] = old
+            subdirs = old["subdirs"]
+        else:
+            stats["listed"] += 1
+            files, subdirs = {}, []
+            prev = old["files"] if old else {}
+            with os.scandir(full) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False): subdirs.append(e.name); continue
+                    if not e.is_file() or (not rel and e.name.startswith(".")): continue
+                    stt = e.stat()
+                    rec = [stt.st_size, stt.st_mtime_ns, None]
+                    p = prev.get(e.name)
+                    if p and p[0] == rec[0] and p[1] == rec[1]: rec[2] = p[2]
+                    if self.hash_files and rec[2] is None:
+                        try: rec[2] = self._hash(e.path)
+                        except OSError: pass
+                    files[e.name] = rec
+            dirs[rel] = {"mtime": mtime, "files": files, "subdirs": subdirs}
+        for name in subdirs: self._scan_dir(os.path.join(rel, name) if rel else name, dirs, stats)
+
+    def scan(self):
+        """增量重扫，返回 {"listed", "skipped"} 统计。"""
+        with self.lock:
+            stats, dirs = {"listed": 0, "skipped": 0}, {}
+            if os.path.isdir(self.root): self._scan_dir("", dirs, stats)
+            changed = stats["listed"] > 0 or dirs.keys() != self.dirs.keys()
+            summary = self._summarize(dirs)
+            self.dirs, self.summary, self.scanned_at = dirs, summary, time.time()
+            if changed:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump({"root": self.root, "dirs": dirs}, f, ensure_ascii=False)
+                os.replace(self.path + ".tmp", self.path)
+        return stats
+
+    @staticmethod
+    def _summarize(dirs):
+        summary = {}
+        for rel, d in dirs.items():
+            if not rel or not d["files"]: continue
+            parts = rel.split(os.sep)
+            mod = parts[1] if len(parts) > 1 else ""
+            agg = summary.setdefault(parts[0], {}).setdefault(mod, [0, 0])
+            agg[0] += len(d["files"]); agg[1] += sum(f[0] for f in d["files"].values())
+        return summary
+
+    def sample_stats(self, sid):
+        mods = self.summary.get(sid, {})
+        return sum(v[0] for v in mods.values()), sum(v[1] for v in mods.values())
+
+    def module_stats(self, sid, mod_name):
+        return tuple(self.summary.get(sid, {}).get(sanitize_filename(mod_name), (0, 0)))
+
+    def samples_with_files(self, pattern=""):
+        """有匹配文件的样品集合：pattern 为空时任意文件；否则模块文件夹名或文件名包含 pattern (不区分大小写)。"""
+        pattern, hits = pattern.lower(), set()
+        for rel, d in self.dirs.items():  # scan 只整体替换 self.dirs，不修改正在遍历的字典
+            if not rel or not d["files"]: continue
+            if not pattern or pattern in rel.lower() or any(pattern in n.lower() for n in d["files"]):
+                hits.add(rel.split(os.sep)[0])
+        return hits
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+def get_manifests(): return _manifests
+
+def get_file_manifest(project_name, rescan=False):
+    """返回项目文件清单；距上次扫描超过 config.MANIFEST_TTL 秒或显式要求时才增量重扫。"""
+    manifests = get_manifests()
+    root = get_project_folder(project_name)
+    with _manifests_lock:
+        man = manifests.get(project_name)
+        if man is None or man.root != root:
+            man = manifests[project_name] = FileManifest(root, os.path.join(config.MANIFEST_DIR, f"{project_name}.json"))
+    if rescan or time.time() - man.scanned_at > config.MANIFEST_TTL: man.scan()
+    return man
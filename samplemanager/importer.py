@@ -0,0 +1,108 @@
+"""批量导入：把仪器导出的 CSV/TSV/Excel 表格按块读取并合并进项目，整个导入只写一次存储。
+
+每行一个样品。样品编号/创建日期/状态/备注/Content_JSON 列 (及常见英文别名) 按原义读取；
+其余列视为参数，列名形如 "模块.参数" 时拆分到对应模块，否则归入 module 参数指定的模块。
+"""
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .projects import load_project_df, save_project_df
+from .samples import allocate_ids
+from .storage import COLUMNS
+
+COLUMN_ALIASES = {
+    "样品编号": "样品编号", "编号": "样品编号", "sample": "样品编号", "sample_id": "样品编号", "id": "样品编号",
+    "创建日期": "创建日期", "日期": "创建日期", "date": "创建日期",
+    "状态": "状态", "status": "状态",
+    "备注": "备注", "remark": "备注", "notes": "备注",
+    "content_json": "Content_JSON",
+}
+
+
+def iter_table_chunks(path, chunksize=5000, sheet=None, sep=None):
+    """逐块产出 DataFrame (所有值为字符串)。xlsx 用 openpyxl 只读模式流式读取。"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else f"col{i}" for i, h in enumerate(next(rows, ()))]
+            buf = []
+            for r in rows:
+                buf.append(["" if v is None else str(v) for v in r[:len(header)]])
+                if len(buf) >= chunksize:
+                    yield pd.DataFrame(buf, columns=header); buf = []
+            if buf: yield pd.DataFrame(buf, columns=header)
+        finally: wb.close()
+    elif ext == ".xls":
+        yield pd.read_excel(path, sheet_name=sheet or 0, dtype=str).fillna("")
+    else:
+        sep = sep or ("\t" if ext in (".tsv", ".txt") else ",")
+        yield from pd.read_csv(path, sep=sep, dtype=str, keep_default_na=False, chunksize=chunksize, encoding="utf-8-sig")
+
+
+def _records(chunk, module):
+    """把一块表格转换为 (元数据字典, 参数内容字典) 序列。"""
+    meta_cols, param_cols = {}, []
+    for c in chunk.columns:
+        key = COLUMN_ALIASES.get(str(c).strip().lower(), COLUMN_ALIASES.get(str(c).strip()))
+        if key: meta_cols[c] = key
+        else:
+            mod, sep, par = str(c).partition(".")
+            param_cols.append((c, mod if sep else module, par if sep else str(c)))
+    for rec in chunk.to_dict("records"):
+        meta = {key: str(rec[c]).strip() for c, key in meta_cols.items() if str(rec[c]).strip()}
+        content = {}
+        if "Content_JSON" in meta:
+            try: content = json.loads(meta.pop("Content_JSON"))
+            except: meta.pop("Content_JSON", None)
+        for c, mod, par in param_cols:
+            v = rec[c]
+            if v is None or v != v or str(v) == "": continue  # v != v: NaN
+            content.setdefault(mod, {})[par] = str(v)
+        yield meta, content
+
+
+def import_table(project_name, path, module="Import", chunksize=5000, sheet=None, sep=None):
+    """导入表格到项目；已存在的样品按模块合并参数，其余新建 (无编号时自动分配)。
+
+    返回 {"created": 新建数, "updated": 更新数}。
+    """
+    df = load_project_df(project_name)
+    pos = {sid: i for i, sid in enumerate(df["样品编号"])}
+    today = datetime.now().strftime("%Y-%m-%d")
+    new_rows, updated = [], set()
+    for chunk in iter_table_chunks(path, chunksize, sheet, sep):
+        for meta, content in _records(chunk, module):
+            sid = meta.get("样品编号", "")
+            if sid in pos:
+                i = pos[sid]
+                try: cur = json.loads(df.iat[i, 4]) if df.iat[i, 4] else {}
+                except: cur = {}
+                for mod, fields in content.items():
+                    if isinstance(fields, dict) and isinstance(cur.get(mod), dict): cur[mod].update(fields)
+                    else: cur[mod] = fields
+                df.iat[i, 4] = json.dumps(cur, ensure_ascii=False)
+                for col in ("创建日期", "状态", "备注"):
+                    if col in meta: df.iat[i, COLUMNS.index(col)] = meta[col]
+                updated.add(sid)
+            else:
+                row = {"样品编号": sid, "创建日期": meta.get("创建日期", today), "状态": meta.get("状态", "制备中"),
+                       "备注": meta.get("备注", ""), "Content_JSON": json.dumps(content, ensure_ascii=False)}
+                new_rows.append(row)
+    # 文件内重复编号：保留最后一行
+    new = pd.DataFrame(new_rows, columns=COLUMNS)
+    named = new[new["样品编号"] != ""].drop_duplicates("样品编号", keep="last")
+    unnamed = new[new["样品编号"] == ""].copy()
+    if len(unnamed):
+        taken = set(named["样品编号"])  # 跳过本次导入中已显式使用的编号
+        ids = [i for i in allocate_ids(project_name, len(unnamed) + len(taken)) if i not in taken]
+        unnamed["样品编号"] = ids[:len(unnamed)]
+    new = pd.concat([named, unnamed], ignore_index=True)
+    if len(new) or updated: save_project_df(project_name, pd.concat([df, new], ignore_index=True))
+    return {"created": len(new), "updated": len(updated)}
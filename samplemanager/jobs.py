@@ -0,0 +1,174 @@
+"""文件夹移动/删除任务队列：先改元数据，再由线程池异步搬运；日志落盘，启动时续跑。"""
+import errno
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import config, perf
+from .files import get_manifests
+
+class FsJobQueue:
+    LOCK_WINERRORS = (5, 32, 33)  # 拒绝访问 / 文件被占用 / 区域被锁定
+
+    def __init__(self, journal, workers=None, retries=None):
+        self.journal = journal
+        self.retries = config.FS_RETRIES if retries is None else retries
+        self.lock = threading.RLock()
+        self.pool = ThreadPoolExecutor(max_workers=workers or config.FS_WORKERS, thread_name_prefix="fs-job")
+        self.jobs, self.running, self.listeners = [], set(), []
+        try:
+            with open(journal, "r", encoding="utf-8") as f: self.jobs = json.load(f)
+        except: pass
+        # 上次未完成的任务 (含运行中被中断的) 重新排队；move/delete 均可重复执行
+        for job in self.jobs:
+            if job["status"] in ("pending", "running"): job["status"] = "pending"
+        with self.lock: self._pump()
+
+    def _key(self, path):
+        # 同一项目文件夹内的任务按提交顺序串行，不同项目可并行
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(config.PROJECTS_DIR))
+        return os.path.abspath(path) if rel.startswith("..") else rel.split(os.sep)[0]
+
+    def _save(self):
+        with self.lock:
+            # 保留提交顺序；已完成的任务只留最近 20 条
+            keep = set([j["id"] for j in self.jobs if j["status"] == "done"][-20:])
+            self.jobs = [j for j in self.jobs if j["status"] != "done" or j["id"] in keep]
+            with open(self.journal + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.jobs, f, ensure_ascii=False, indent=1)
+            os.replace(self.journal + ".tmp", self.journal)
+
+    def submit(self, op, src, dst=None):
+        """op: "move" (src -> dst) 或 "delete" (src)。返回任务 id。"""
+        job = {"id": f"{time.time_ns():x}", "op": op, "src": src, "dst": dst, "status": "pending",
+               "keys": sorted({self._key(p) for p in (src, dst) if p}), "attempts": 0, "error": "",
+               "done": 0, "total": 0, "created": datetime.now().isoformat(timespec="seconds")}
+        with self.lock:
+            self.jobs.append(job); self._save(); self._pump()
+        return job["id"]
+
+    def _pump(self):
+        # 按提交顺序调度：与更早的未完成任务涉及同一文件夹的任务需等待
+        busy = set()
+        for job in self.jobs:
+            if job["status"] not in ("pending", "running"): continue
+            keys = set(job["keys"])
+            if job["status"] == "pending" and job["id"] not in self.running and not keys & busy:
+                self.running.add(job["id"]); self.pool.submit(self._run, job)
+            busy |= keys
+
+    def _is_lock_error(self, e):
+        return isinstance(e, PermissionError) or getattr(e, "winerror", None) in self.LOCK_WINERRORS
+
+    def _run(self, job):
+        job["status"] = "running"; self._save()
+        while True:
+            job["attempts"] += 1
+            try:
+                with perf.span(f"fs.{job['op']}", src=os.path.basename(job["src"])) as sp:
+                    (self._move if job["op"] == "move" else self._delete)(job)
+                    sp.set(bytes=job["done"] or job["total"])
+                job["status"], job["error"] = "done", ""
+                break
+            except Exception as e:
+                job["error"] = str(e)
+                if not self._is_lock_error(e) or job["attempts"] > self.retries:
+                    job["status"] = "failed"; break
+                time.sleep(min(0.5 * 2 ** (job["attempts"] - 1), 10))  # Windows 文件锁：退避重试
+        with self.lock:
+            self.running.discard(job["id"]); self._save(); self._pump()
+        for fn in self.listeners:
+            try: fn(job)
+            except: pass
+
+    @staticmethod
+    def _tree_size(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for f in files:
+                try: total += os.path.getsize(os.path.join(root, f))
+                except OSError: pass
+        return total
+
+    def _copy(self, job, src, dst):
+        shutil.copy2(src, dst)
+        with self.lock: job["done"] += os.path.getsize(dst)
+
+    def _move(self, job):
+        src, dst = job["src"], job["dst"]
+        if job.get("cleanup"):  # 复制已完成，只剩删除源目录
+            if os.path.exists(src): shutil.rmtree(src)
+            return
+        if not os.path.exists(src): return  # 已移动过 (如中断后恢复) 或源不存在
+        if os.path.exists(dst):
+            if not job.get("copying"): raise FileExistsError(f"目标已存在: {dst}")
+            shutil.rmtree(dst)  # 上次跨盘复制中断留下的半成品
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.rename(src, dst); return
+        except OSError as e:
+            if e.errno != errno.EXDEV: raise
+        # 跨盘 (如网络共享) 时逐文件复制以报告进度；任务字典的修改与 _save 的 json.dump 同在锁内，避免写盘时字典变化
+        total = self._tree_size(src)
+        with self.lock:
+            job["total"], job["done"], job["copying"] = total, 0, True; self._save()
+        shutil.copytree(src, dst, copy_function=lambda a, b: self._copy(job, a, b))
+        with self.lock:
+            job["copying"], job["cleanup"] = False, True; self._save()
+        shutil.rmtree(src)
+
+    def _delete(self, job):
+        path = job["src"]
+        if not os.path.exists(path): return
+        if not job["total"]:
+            total = self._tree_size(path)
+            with self.lock: job["total"] = total
+        for root, dirs, files in os.walk(path, topdown=False):
+            for f in files:
+                fp = os.path.join(root, f)
+                size = os.path.getsize(fp)
+                os.remove(fp)
+                with self.lock: job["done"] += size
+            for d in dirs: os.rmdir(os.path.join(root, d))
+        os.rmdir(path)
+
+    def active(self):
+        return [j for j in self.jobs if j["status"] in ("pending", "running")]
+
+    def failed(self):
+        return [j for j in self.jobs if j["status"] == "failed"]
+
+    def retry(self, job_id):
+        with self.lock:
+            for job in self.jobs:
+                if job["id"] == job_id and job["status"] == "failed":
+                    job.update(status="pending", attempts=0, error="")
+            self._save(); self._pump()
+
+    def dismiss(self, job_id):
+        with self.lock:
+            self.jobs = [j for j in self.jobs if j["id"] != job_id or j["status"] != "failed"]
+            self._save()
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_fs_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            config.ensure_dirs()
+            _queue = FsJobQueue(config.FS_JOURNAL)
+            # 任务完成后让文件清单在下次访问时重扫
+            _queue.listeners.append(lambda job: [setattr(m, "scanned_at", 0.0) for m in list(get_manifests().values())])
+        return _queue
+
+def move_folder(src, dst):
+    if os.path.exists(src) or get_fs_queue().active(): get_fs_queue().submit("move", src, dst)
+
+def delete_folder(path):
+    if os.path.exists(path) or get_fs_queue().active(): get_fs_queue().submit("delete", path)
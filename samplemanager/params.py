@@ -0,0 +1,57 @@
+"""参数长表：(样品, 模块, 参数, 原值, 数值, 单位)，用于向量化的数值筛选。"""
+import pandas as pd
+
+PARAM_COLUMNS = ["样品编号", "module", "param", "value", "num", "unit"]
+# 值形如 "300", "1.2e3 mJ", "-5 ℃"；参数名形如 "Temperature(C)" 时单位取括号内
+_NUM_RE = r"^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([^\d\s\-+.,:/~].*)?$"
+_UNIT_IN_NAME_RE = r"[(（\[]\s*([^)）\]]+?)\s*[)）\]]\s*$"
+PARAM_OPS = ["=", "≠", ">", "≥", "<", "≤", "区间", "包含"]
+
+def build_param_table(contents):
+    recs = [(sid, m, k, v) for sid, content in contents.items() for m, fields in content.items()
+            if isinstance(fields, dict) for k, v in fields.items()]
+    table = pd.DataFrame(recs, columns=PARAM_COLUMNS[:4]).astype(str)
+    parsed = table["value"].str.extract(_NUM_RE)
+    table["num"] = pd.to_numeric(parsed[0], errors="coerce")
+    name_unit = table["param"].str.extract(_UNIT_IN_NAME_RE)[0]
+    table["unit"] = parsed[1].str.strip().where(parsed[1].notna() & (parsed[1].str.strip() != ""), name_unit).fillna("")
+    return table
+
+def update_param_table(table, changed, removed=()):
+    """changed: {sid: content} 需重建的样品；removed: 已删除的样品编号。"""
+    drop = set(changed) | set(removed)
+    if not drop: return table
+    kept = table[~table["样品编号"].isin(drop)]
+    fresh = build_param_table(changed)
+    if fresh.empty: return kept.reset_index(drop=True)
+    if kept.empty: return fresh
+    return pd.concat([kept, fresh], ignore_index=True)
+
+def _to_float(v):
+    try: return float(v)
+    except (TypeError, ValueError): return None
+
+def filter_by_params(table, preds):
+    """preds: [{"module", "param", "op", "value", "value2"}]，module 为 "*" 表示任意模块。
+    返回同时满足全部条件的样品编号 (pd.Index)，比较与求交集均为向量化操作。"""
+    sids = None
+    for p in preds:
+        mask = table["param"] == p["param"]
+        if p["module"] != "*": mask &= table["module"] == p["module"]
+        op, v = p["op"], str(p["value"]).strip()
+        num, col = _to_float(v), table["num"]
+        if op == "包含": mask &= table["value"].str.contains(v, case=False, regex=False)
+        elif op in ("=", "≠"):
+            hit = (col == num) if num is not None else (table["value"].str.strip() == v)
+            mask &= ~hit if op == "≠" else hit
+        elif op == "区间":
+            hi = _to_float(p.get("value2"))
+            mask &= col.notna()
+            if num is not None: mask &= col >= num
+            if hi is not None: mask &= col <= hi
+        elif num is None: mask &= False
+        else: mask &= {">": col > num, "≥": col >= num, "<": col < num, "≤": col <= num}[op]
+        found = pd.Index(table.loc[mask.to_numpy(), "样品编号"].unique())
+        sids = found if sids is None else sids.intersection(found)
+        if sids.empty: break
+    return sids if sids is not None else pd.Index([])
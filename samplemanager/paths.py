@@ -0,0 +1,15 @@
+"""项目/样品/模块文件夹路径。只计算路径，不创建目录。"""
+import os
+import re
+
+from . import config
+
+
+def sanitize_filename(name): return re.sub(r'[\\/*?:"<>|]', "_", name)
+
+def get_project_csv(name): return os.path.join(config.PROJECTS_DIR, f"{name}.csv")
+def get_project_folder(name): return os.path.join(config.PROJECTS_DIR, f"{name}_Files")
+def get_sample_folder(proj, sid): return os.path.join(get_project_folder(proj), sid)
+
+def get_module_folder(project_name, sample_id, mod_name):
+    return os.path.join(get_sample_folder(project_name, sample_id), sanitize_filename(mod_name))
@@ -0,0 +1,124 @@
+"""轻量性能计时：按页面重跑 (rerun) 收集各阶段耗时、行数与字节数，写入轮转的 JSONL 日志，供侧边栏诊断面板统计。
+
+是否记录由每个会话传给 begin_run 的 enabled 决定 (默认 config.PERF_ENABLED)，会话之间互不影响；
+未启用时 span() 直接返回空操作对象，开销只有一次线程局部变量判断。
+不属于任何重跑的计时 (后台备份线程、文件夹任务) 记为 background 事件，仅在 config.PERF_ENABLED (SM_PERF=1) 时记录。
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from . import config
+
+_local = threading.local()  # 每个 Streamlit 会话的脚本线程各自记录当前重跑与是否启用
+_history = deque(maxlen=config.PERF_HISTORY)
+_background = deque(maxlen=config.PERF_HISTORY)
+_log_lock = threading.Lock()
+
+
+class _NoopSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def set(self, **attrs): pass
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "t0")
+
+    def __init__(self, name, attrs): self.name, self.attrs = name, attrs
+    def __enter__(self): self.t0 = time.perf_counter(); return self
+    def set(self, **attrs): self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        rec = {"name": self.name, "ms": round((end - self.t0) * 1000, 3), **self.attrs}
+        if exc_type is not None: rec["exc"] = exc_type.__name__  # 含 st.rerun 触发的 RerunException
+        run = getattr(_local, "run", None)
+        if run is not None:
+            run["spans"].append(rec); run["last"] = end
+        else:
+            rec = {"kind": "background", "ts": datetime.now().isoformat(timespec="seconds"), **rec}
+            _background.append(rec); _write(rec)
+        return False
+
+
+def span(name, **attrs):
+    """计时一个阶段：with perf.span("storage.load", rows=n) as sp: ...; sp.set(bytes=...)"""
+    enabled = getattr(_local, "enabled", None)  # 脚本线程由 begin_run 设置，其他线程跟随全局开关
+    if not (config.PERF_ENABLED if enabled is None else enabled): return _NOOP
+    return Span(name, attrs)
+
+
+def begin_run(enabled=None, **attrs):
+    """在脚本开头调用；enabled 为本会话的开关 (None 时用 config.PERF_ENABLED)。
+    上一次未正常结束的重跑 (被 st.rerun/st.stop 中断) 先行结算。"""
+    _finish(interrupted=True)
+    _local.enabled = config.PERF_ENABLED if enabled is None else bool(enabled)
+    if not _local.enabled: return
+    t0 = time.perf_counter()
+    _local.run = {"kind": "rerun", "ts": datetime.now().isoformat(timespec="seconds"), "t0": t0, "last": t0, "spans": [], **attrs}
+
+
+def annotate(**attrs):
+    """给当前重跑补充属性 (如项目名)，中断的重跑也能带上。"""
+    run = getattr(_local, "run", None)
+    if run is not None: run.update(attrs)
+
+
+def end_run(**attrs):
+    run = getattr(_local, "run", None)
+    if run is not None: run.update(attrs); run["last"] = time.perf_counter()
+    _finish(interrupted=False)
+
+
+def _finish(interrupted):
+    run = getattr(_local, "run", None)
+    if run is None: return
+    _local.run = None
+    t0, last = run.pop("t0"), run.pop("last")
+    run["total_ms"] = round((last - t0) * 1000, 3)  # 中断的重跑截止到最后一个计时段结束
+    if interrupted: run["interrupted"] = True
+    _history.append(run); _write(run)
+
+
+def _write(rec):
+    path = config.PERF_LOG
+    line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+    with _log_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > config.PERF_LOG_MAX_BYTES:
+                for i in range(config.PERF_LOG_BACKUPS - 1, 0, -1):
+                    if os.path.exists(f"{path}.{i}"): os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f: f.write(line)
+        except OSError: pass
+
+
+def history(): return list(_history)
+def background(): return list(_background)
+
+
+def summarize(runs):
+    """按阶段汇总若干次重跑：次数、p50/p95/最大耗时 (ms)，以及平均行数/字节数/控件数。"""
+    spans = [dict(s, run=i) for i, r in enumerate(runs) for s in r["spans"]]
+    spans += [{"name": "(整次重跑)", "ms": r["total_ms"], "run": i} for i, r in enumerate(runs)]
+    if not spans: return pd.DataFrame()
+    sdf = pd.DataFrame(spans)
+    # 同一次重跑中多次出现的阶段 (如 load_presets 调用两次) 先按重跑求和
+    extra = [c for c in ("rows", "bytes", "widgets") if c in sdf.columns]
+    per_run = sdf.groupby(["name", "run"]).agg(ms=("ms", "sum"), calls=("ms", "size"), **{c: (c, lambda v: v.sum(min_count=1)) for c in extra})
+    g = per_run.groupby(level="name")
+    out = pd.DataFrame({"重跑数": g.size(), "次/重跑": g["calls"].mean().round(1),
+                        "p50 ms": g["ms"].quantile(0.5).round(2), "p95 ms": g["ms"].quantile(0.95).round(2),
+                        "max ms": g["ms"].max().round(2)})
+    for c, label in (("rows", "行数"), ("bytes", "字节"), ("widgets", "控件")):
+        if c in per_run.columns: out[label] = g[c].mean().round(0)
+    return out.sort_values("p95 ms", ascending=False)
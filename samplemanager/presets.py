@@ -0,0 +1,22 @@
+"""模板预设 (presets.json) 的读写。"""
+import json
+import os
+
+from . import config, perf
+
+def load_presets():
+    if not os.path.exists(config.CONFIG_FILE):
+        defaults = {
+            "PLD_Thin_Film": {"Deposition": ["Laser_Energy", "Oxygen_Pressure"], "XRD_Test": ["Scan_Range"]},
+            "Ceramic_Sintering": {"Pressing": ["Pressure"], "Sintering": ["Temperature"]}
+        }
+        with open(config.CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump(defaults, f, ensure_ascii=False, indent=4)
+    try:
+        with perf.span("presets.load", bytes=os.path.getsize(config.CONFIG_FILE)), open(config.CONFIG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except: return {}
+
+def save_presets(presets):
+    with open(config.CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(presets, f, ensure_ascii=False, indent=4)
@@ -0,0 +1,175 @@
+"""项目读写与进程内缓存：按存储指纹 (CSV 的 mtime/size 或 SQLite 的版本号) 判断是否变化。
+
+缓存由所有 Streamlit 会话共享；条目的更新与搜索索引的读写都在 _lock 下进行。
+"""
+import json
+import threading
+
+import pandas as pd
+
+from . import perf
+from .backup import execute_backup, get_backup_engine
+from .params import build_param_table, update_param_table
+from .search import SearchIndex
+from .storage import COLUMNS, empty_project_df, get_storage
+
+_cache = {"entries": {}, "hits": 0, "misses": 0}
+_lock = threading.RLock()
+
+def get_project_cache(): return _cache
+
+def _parse_content(raw, old_raw=None, old_content=None):
+    # 复用上一版本中 JSON 字符串未变的解析结果，只解析改动过的行
+    content = {}
+    for sid, js in raw.items():
+        if old_raw is not None and old_raw.get(sid) == js and sid in old_content:
+            content[sid] = old_content[sid]; continue
+        try: parsed = json.loads(js) if js else {}
+        except: parsed = {}
+        content[sid] = parsed if isinstance(parsed, dict) else {}  # "null"/"[]" 等也按空内容处理
+    return content
+
+def _update_cache(project_name, df, sig):
+    cache = get_project_cache()
+    old = cache["entries"].get(project_name)
+    raw = dict(zip(df["样品编号"], df["Content_JSON"]))
+    remarks = dict(zip(df["样品编号"], df["备注"]))
+    meta = dict(zip(df["样品编号"], zip(df["状态"], df["创建日期"])))  # 搜索索引也覆盖状态与日期
+    with perf.span("cache.parse_json", rows=len(raw)):
+        content = _parse_content(raw, old and old["raw"], old and old["content"])
+    index, params = None, None
+    if old and (old["index"] is not None or old["params"] is not None):
+        # 已建立的搜索索引/参数表只更新新增、改动、删除的样品
+        removed = old["raw"].keys() - raw.keys()
+        changed = {sid for sid, js in raw.items() if old["raw"].get(sid) != js or old["remarks"].get(sid) != remarks[sid]
+                   or old["meta"].get(sid) != meta[sid]}
+        if old["index"] is not None:
+            index = old["index"]  # 改动量通常很小，不单独计时
+            for sid in removed: index.remove(sid)
+            for sid in changed: index.update(sid, remarks[sid], content[sid], *meta[sid])
+        if old["params"] is not None:
+            params = update_param_table(old["params"], {sid: content[sid] for sid in changed}, removed)
+    cache["entries"][project_name] = {"sig": sig, "df": df.copy(), "raw": raw, "remarks": remarks, "meta": meta,
+                                      "content": content, "index": index, "params": params,
+                                      "next_id": old["next_id"] if old else None}
+    return cache["entries"][project_name]
+
+def _apply_rows(df, rows, removed=()):
+    """把改动行并入 df：已有编号原位替换，新编号追加到末尾，删除 removed 中的编号。返回新 DataFrame。"""
+    # 只用 "大表.isin(少量编号)"，反方向的 isin 在 Arrow 字符串列上会逐个遍历整列
+    sids, out = df["样品编号"], df.copy()
+    upd = rows.set_index("样品编号")[COLUMNS[1:]]
+    hit = sids.isin(list(upd.index)).to_numpy()
+    if hit.any(): out.loc[hit, COLUMNS[1:]] = upd.loc[sids[hit]].to_numpy()
+    if removed: out = out[~sids.isin(list(removed)).to_numpy()]
+    found = set(sids[hit])
+    new = upd[[s not in found for s in upd.index]].reset_index()
+    if len(new): out = pd.concat([out, new[COLUMNS]], ignore_index=True)
+    return out.reset_index(drop=True)
+
+def _patch_cache(project_name, old, rows, removed, sig):
+    """只按改动行更新缓存条目，不遍历整个项目；字典复制后再改，已交给调用方的对象保持不变。"""
+    with perf.span("cache.patch", rows=len(rows), deleted=len(removed)):
+        raw, remarks, meta, content = dict(old["raw"]), dict(old["remarks"]), dict(old["meta"]), dict(old["content"])
+        for sid in removed:
+            raw.pop(sid, None); remarks.pop(sid, None); meta.pop(sid, None); content.pop(sid, None)
+        fresh = dict(zip(rows["样品编号"], rows["Content_JSON"]))
+        raw.update(fresh)
+        remarks.update(zip(rows["样品编号"], rows["备注"]))
+        meta.update(zip(rows["样品编号"], zip(rows["状态"], rows["创建日期"])))
+        content.update(_parse_content(fresh))
+        if old["index"] is not None:
+            for sid in removed: old["index"].remove(sid)
+            for sid in fresh: old["index"].update(sid, remarks[sid], content[sid], *meta[sid])
+        params = old["params"]
+        if params is not None: params = update_param_table(params, {sid: content[sid] for sid in fresh}, removed)
+        entry = dict(old, sig=sig, df=_apply_rows(old["df"], rows, removed), raw=raw, remarks=remarks, meta=meta,
+                     content=content, params=params)
+    get_project_cache()["entries"][project_name] = entry
+    return entry
+
+def get_project_entry(project_name):
+    storage = get_storage()
+    with _lock:
+        sig = storage.fingerprint(project_name)
+        if sig is None: return None
+        cache = get_project_cache()
+        entry = cache["entries"].get(project_name)
+        if entry is not None and entry["sig"] == sig:
+            cache["hits"] += 1
+            return entry
+        cache["misses"] += 1
+        entry = _update_cache(project_name, storage.load(project_name), sig)
+    # 没有任何历史版本的项目 (如刚迁移) 补一个初始快照，由后台线程写入
+    if not get_backup_engine().has_versions(project_name): execute_backup(project_name, entry["df"])
+    return entry
+
+def load_project_df(project_name):
+    entry = get_project_entry(project_name)
+    if entry is None: return empty_project_df()
+    return entry["df"].copy()
+
+def load_project_content(project_name):
+    """返回 {样品编号: 已解析的 Content_JSON 字典}，调用方不应修改返回值。"""
+    entry = get_project_entry(project_name)
+    return entry["content"] if entry else {}
+
+def get_search_index(project_name):
+    """项目的搜索索引，首次搜索时构建，之后随保存增量维护。索引会被原地更新，并发查询请用 search_samples。"""
+    with _lock:
+        entry = get_project_entry(project_name)
+        if entry is None: return SearchIndex()
+        if entry["index"] is None: entry["index"] = SearchIndex.build(entry["remarks"], entry["content"], entry["meta"])
+        return entry["index"]
+
+def search_samples(project_name, query):
+    """在锁内执行搜索，避免其他会话保存时同时修改索引。返回样品编号集合。"""
+    with _lock: return get_search_index(project_name).search(query)
+
+def get_param_table(project_name):
+    """项目的参数长表，首次筛选时构建，之后随保存增量维护 (每次更新生成新表，不原地修改)。"""
+    with _lock:
+        entry = get_project_entry(project_name)
+        if entry is None: return build_param_table({})
+        if entry["params"] is None: entry["params"] = build_param_table(entry["content"])
+        return entry["params"]
+
+def save_project_df(project_name, df):
+    df = df.fillna("").astype(str)
+    with _lock:
+        old = get_project_cache()["entries"].get(project_name)
+        sig = get_storage().save(project_name, df, old["df"] if old else None)
+        # 写入后直接刷新缓存，下次加载无需重新解析
+        entry = _update_cache(project_name, df, sig)
+    execute_backup(project_name, entry["df"])
+
+def save_project_rows(project_name, rows=None, removed=()):
+    """只保存改动的行 rows (含全部列的 DataFrame，新编号追加到末尾) 并删除 removed 中的编号。
+
+    SQLite 下只写这些行、只更新缓存中涉及的样品；CSV 后端或项目含重复编号时退回整表保存。
+    """
+    rows = empty_project_df() if rows is None else rows[COLUMNS].fillna("").astype(str).drop_duplicates("样品编号", keep="last")
+    removed = set(removed)
+    storage = get_storage()
+    with _lock:
+        # 先按指纹取最新条目，改动合并到最新数据上 (其他会话刚保存的行不会被覆盖)
+        entry = get_project_entry(project_name)
+        if entry is None or not storage.row_level or len(entry["raw"]) != len(entry["df"]):
+            return save_project_df(project_name, _apply_rows(entry["df"] if entry else empty_project_df(), rows, removed))
+        sig = storage.save_rows(project_name, rows, removed)
+        if sig == entry["sig"] + 1: entry = _patch_cache(project_name, entry, rows, removed, sig)
+        else:  # 期间有其他进程写入，整体重新加载
+            drop_project_cache(project_name)
+            entry = get_project_entry(project_name)
+    execute_backup(project_name, entry["df"])
+
+def drop_project_cache(project_name):
+    with _lock: get_project_cache()["entries"].pop(project_name, None)
+
+def rename_project(old, new):
+    get_storage().rename(old, new)
+    drop_project_cache(old)
+
+def delete_project(project_name):
+    get_storage().delete(project_name)
+    drop_project_cache(project_name)
@@ -0,0 +1,86 @@
+"""样品操作：编号分配、批量新建/修改/删除、重命名。每个操作只写一次存储，新建/修改/删除只写涉及的行。"""
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from .jobs import delete_folder, move_folder
+from .paths import get_sample_folder
+from .projects import _lock as _cache_lock, get_project_entry, save_project_df, save_project_rows
+from .storage import COLUMNS
+
+def allocate_ids(project_name, n=1):
+    """分配 n 个新编号 {项目}-001 …；计数器缓存在项目缓存中，每次分配 O(n) 与项目规模无关。"""
+    with _cache_lock:  # 计数器在会话间共享
+        entry = get_project_entry(project_name)
+        if entry is None: return [f"{project_name}-{i:03d}" for i in range(1, n + 1)]
+        if entry["next_id"] is None:
+            nums = entry["df"]["样品编号"].str.extract(rf"^{re.escape(project_name)}-(\d+)$")[0]
+            nums = pd.to_numeric(nums, errors="coerce")
+            entry["next_id"] = int(nums.max()) + 1 if nums.notna().any() else 1
+        ids, i = [], entry["next_id"]
+        while len(ids) < n:
+            nid = f"{project_name}-{i:03d}"
+            if nid not in entry["raw"]: ids.append(nid)  # 跳过被手动改名占用的编号
+            i += 1
+        entry["next_id"] = i
+        return ids
+
+def get_new_id(project_name): return allocate_ids(project_name, 1)[0]
+
+def template_content(preset):
+    return {m: ({f: "" for f in fields} if isinstance(fields, list) else {}) for m, fields in preset.items()}
+
+def bulk_create(project_name, n, content=None, source=None):
+    """新建 n 个样品 (追加到末尾)：source 为克隆源行 (Series)，否则使用 content 字典 (模板或空白)。返回新编号列表。"""
+    ids = allocate_ids(project_name, n)
+    if source is not None:
+        new = pd.DataFrame([source] * n).reset_index(drop=True)
+        new["样品编号"] = ids
+    else:
+        new = pd.DataFrame({"样品编号": ids, "创建日期": datetime.now().strftime("%Y-%m-%d"), "状态": "制备中",
+                            "备注": "", "Content_JSON": json.dumps(content or {}, ensure_ascii=False)})
+    save_project_rows(project_name, new[COLUMNS])
+    return ids
+
+def bulk_update(project_name, df, sids, status=None, remark=None, append_remark=False):
+    """批量修改状态/备注，返回修改的条数。"""
+    mask = df["样品编号"].isin(sids)
+    if status: df.loc[mask, "状态"] = status
+    if remark is not None:
+        if append_remark: df.loc[mask, "备注"] = (df.loc[mask, "备注"] + " " + remark).str.strip()
+        else: df.loc[mask, "备注"] = remark
+    save_project_rows(project_name, df[mask])
+    return int(mask.sum())
+
+def bulk_delete(project_name, df, sids, delete_folders=True):
+    """批量删除样品 (可同时删除样品文件夹)，返回删除的条数。"""
+    mask = df["样品编号"].isin(sids)
+    save_project_rows(project_name, removed=df.loc[mask, "样品编号"])
+    if delete_folders:
+        for sid in df.loc[mask, "样品编号"]: delete_folder(get_sample_folder(project_name, sid))
+    return int(mask.sum())
+
+# 排序选项 -> (排序列, 是否升序)
+SORT_OPTIONS = {"日期 (新→旧)": ("创建日期", False), "日期 (旧→新)": ("创建日期", True),
+                "编号 (A-Z)": ("样品编号", True), "编号 (Z-A)": ("样品编号", False), "状态": ("状态", True)}
+
+def sort_samples(df, sort_opt):
+    by, ascending = SORT_OPTIONS[sort_opt]
+    return df.sort_values(by=by, ascending=ascending)
+
+def rename_sample_logic(project_name, df, old_sid, new_sid):
+    if not new_sid: return False, "编号不能为空"
+    if new_sid in df["样品编号"].values: return False, "新编号已存在"
+    old_folder = get_sample_folder(project_name, old_sid)
+    new_folder = get_sample_folder(project_name, new_sid)
+    if os.path.exists(new_folder): return False, "同名样品文件夹已存在"
+    try:
+        # 先更新元数据，文件夹由后台任务移动
+        df.loc[df["样品编号"] == old_sid, "样品编号"] = new_sid
+        save_project_df(project_name, df)
+        move_folder(old_folder, new_folder)
+        return True, "成功"
+    except Exception as e: return False, f"重命名失败: {e}"
@@ -0,0 +1,137 @@
+"""搜索索引：词元倒排表 + 词表 n-gram，支持 module:xxx / 参数名:值 的字段查询。"""
+import re
+import shlex
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def _ngrams(s):
+    return {s[i:i + n] for n in (1, 2, 3) for i in range(len(s) - n + 1)}
+
+class SearchIndex:
+    FIELD_ALIASES = {"module": "module", "模块": "module", "id": "id", "编号": "id", "remark": "remark", "备注": "remark",
+                     "status": "status", "状态": "status", "date": "date", "日期": "date"}
+
+    def __init__(self):
+        self.docs = {}      # sid -> {"id", "remark", "status", "date", "text", "modules", "params"}
+        self.postings = {}  # 词元 -> {sid}，词元来自编号/备注/状态/日期/模块名/参数值 (不含参数名)
+        self.grams = {}     # 1~3 元组 -> {词元}，用于在词表中做子串匹配
+        self.modules = {}   # 模块名(小写) -> {sid}
+        self.values = {}    # 参数名(小写) -> {值词元 -> {sid}}
+
+    @classmethod
+    def build(cls, remarks, contents, meta=None):
+        """meta: {sid: (状态, 创建日期)}。"""
+        index, meta = cls(), meta or {}
+        for sid, content in contents.items(): index.update(sid, remarks.get(sid, ""), content, *meta.get(sid, ("", "")))
+        return index
+
+    @staticmethod
+    def _unlink(table, key, sid):
+        bucket = table.get(key)
+        if bucket is None: return False
+        bucket.discard(sid)
+        if not bucket: del table[key]; return True
+        return False
+
+    def update(self, sid, remark, content, status="", date=""):
+        self.remove(sid)
+        modules = [str(m).lower() for m in content]
+        params = {}
+        for fields in content.values():
+            if not isinstance(fields, dict): continue
+            for k, v in fields.items(): params.setdefault(str(k).lower(), []).append(str(v).lower())
+        values = [v for vs in params.values() for v in vs]
+        status, date = str(status).lower(), str(date).lower()
+        text = "\x00".join([sid.lower(), str(remark).lower(), status, date] + modules + values)
+        self.docs[sid] = {"id": sid.lower(), "remark": str(remark).lower(), "status": status, "date": date,
+                          "text": text, "modules": modules, "params": params}
+        postings, grams = self.postings, self.grams
+        for tok in set(_TOKEN_RE.findall(text)):
+            bucket = postings.get(tok)
+            if bucket is None:
+                bucket = postings[tok] = set()
+                for g in _ngrams(tok): grams.setdefault(g, set()).add(tok)
+            bucket.add(sid)
+        for m in modules: self.modules.setdefault(m, set()).add(sid)
+        for k, vs in params.items():
+            table = self.values.setdefault(k, {})
+            for tok in {t for v in vs for t in _TOKEN_RE.findall(v)} or {""}: table.setdefault(tok, set()).add(sid)
+
+    def remove(self, sid):
+        doc = self.docs.pop(sid, None)
+        if doc is None: return
+        for tok in set(_TOKEN_RE.findall(doc["text"])):
+            if self._unlink(self.postings, tok, sid):
+                for g in _ngrams(tok): self._unlink(self.grams, g, tok)
+        for m in doc["modules"]: self._unlink(self.modules, m, sid)
+        for k, vs in doc["params"].items():
+            table = self.values[k]
+            for tok in {t for v in vs for t in _TOKEN_RE.findall(v)} or {""}: self._unlink(table, tok, sid)
+            if not table: del self.values[k]
+
+    def _vocab(self, part):
+        """词表中包含 part 的所有词元。"""
+        if len(part) <= 3: return self.grams.get(part, ())
+        cands = None
+        for g in {part[i:i + 3] for i in range(len(part) - 2)}:
+            cands = set(self.grams.get(g, ())) if cands is None else cands & self.grams.get(g, set())
+            if not cands: return ()
+        return [t for t in cands if part in t]
+
+    @staticmethod
+    def _lookup(table, parts, vocab):
+        """返回 parts 中各词元都命中 (子串) 的候选 sid 集合。
+
+        最长的词元优先；候选已经很少时直接返回，由调用方按原文复核 (多词元时总会复核)。
+        """
+        sids = None
+        for part in sorted(parts, key=len, reverse=True):
+            hit = set()
+            for tok in vocab(part): hit |= table[tok]
+            sids = hit if sids is None else sids & hit
+            if len(sids) <= 256: break
+        return sids
+
+    def _free(self, term, field="text"):
+        parts = _TOKEN_RE.findall(term)
+        if not parts: return {s for s, d in self.docs.items() if term in d[field]}
+        sids = self._lookup(self.postings, parts, self._vocab)
+        # 含分隔符的词 (如 P-001) 或限定字段时按原文复核
+        if field != "text" or len(parts) > 1 or parts[0] != term:
+            sids = {s for s in sids if term in self.docs[s][field]}
+        return sids
+
+    def _param(self, key, value):
+        sids = set()
+        parts = _TOKEN_RE.findall(value)
+        for k in (k for k in self.values if key in k):
+            table = self.values[k]
+            if parts: hit = self._lookup(table, parts, lambda p: [t for t in table if p in t])
+            else: hit = set().union(*table.values())
+            if value and (len(parts) != 1 or parts[0] != value):
+                hit = {s for s in hit if any(value in v for v in self.docs[s]["params"].get(k, ()))}
+            sids |= hit
+        return sids
+
+    def _field(self, field, value):
+        kind = self.FIELD_ALIASES.get(field)
+        if kind == "module":
+            sids = set()
+            for m in (m for m in self.modules if value in m): sids |= self.modules[m]
+            return sids
+        if kind in ("id", "remark", "status", "date"): return self._free(value, kind) if value else set(self.docs)
+        return self._param(field, value)
+
+    def search(self, query):
+        """返回满足查询中所有条件 (空格分隔, 可用引号) 的样品编号集合。"""
+        result = None
+        for term in shlex_split(query.lower()):
+            field, sep, value = term.partition(":")
+            hit = self._field(field, value) if sep and field else self._free(term)
+            result = hit if result is None else result & hit
+            if not result: break
+        return result if result is not None else set(self.docs)
+
+def shlex_split(query):
+    try: return shlex.split(query)
+    except ValueError: return query.split()
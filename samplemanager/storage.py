@@ -0,0 +1,223 @@
+"""存储后端：CSV (兼容旧版) / SQLite (默认，WAL 模式，行级 UPSERT)。"""
+import os
+import shutil
+import sqlite3
+import threading
+
+import pandas as pd
+
+from . import config, perf
+from .paths import get_project_csv
+
+COLUMNS = ["样品编号", "创建日期", "状态", "备注", "Content_JSON"]
+
+def empty_project_df(): return pd.DataFrame(columns=COLUMNS)
+
+def _file_sig(path):
+    try:
+        stt = os.stat(path)
+        return (stt.st_mtime_ns, stt.st_size)
+    except OSError: return None
+
+def _read_project_csv(src, strict=False):
+    """读取项目 CSV；无法解析时返回空表，strict 时抛出异常 (迁移时不能把读不了的文件当成空项目)。"""
+    try:
+        with perf.span("csv.parse") as sp, open(src, 'r', encoding='utf-8') as f:
+            df = pd.read_csv(f, dtype=str, keep_default_na=False)
+            sp.set(rows=len(df), bytes=os.path.getsize(src))
+        if "样品编号" not in df.columns: raise ValueError("缺少 样品编号 列")
+        if "Content_JSON" not in df.columns: df["Content_JSON"] = "{}"
+        return df.fillna("").astype(str)
+    except:
+        if strict: raise
+        return empty_project_df()
+
+class CsvStorage:
+    name = "csv"
+    row_level = False  # 只能整表重写，没有 save_rows
+    migration_issues = {}
+
+    def list_projects(self):
+        return [f[:-4] for f in os.listdir(config.PROJECTS_DIR) if f.endswith(".csv")]
+
+    def exists(self, project): return os.path.exists(get_project_csv(project))
+    def fingerprint(self, project): return _file_sig(get_project_csv(project))
+    def load(self, project): return _read_project_csv(get_project_csv(project))
+
+    def save(self, project, df, old_df=None):
+        # 先写临时文件再替换，写到一半崩溃也不会截断原 CSV
+        dst = get_project_csv(project)
+        tmp = dst + ".tmp"
+        with perf.span("storage.save", backend="csv", rows=len(df)) as sp:
+            df.to_csv(tmp, index=False, encoding='utf-8')
+            os.replace(tmp, dst)
+            sig = _file_sig(dst)
+            sp.set(bytes=sig[1])
+        return sig
+
+    def rename(self, old, new): shutil.move(get_project_csv(old), get_project_csv(new))
+
+    def delete(self, project):
+        if os.path.exists(get_project_csv(project)): os.remove(get_project_csv(project))
+
+    def export_csv(self, project, dst):
+        shutil.copy2(get_project_csv(project), dst)
+
+class SqliteStorage:
+    name = "sqlite"
+    row_level = True
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS projects (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);
+    CREATE TABLE IF NOT EXISTS samples (
+        project TEXT NOT NULL, sid TEXT NOT NULL, seq REAL NOT NULL,
+        created TEXT, status TEXT, remark TEXT, content TEXT,
+        PRIMARY KEY (project, sid));
+    CREATE INDEX IF NOT EXISTS idx_samples_sid ON samples (sid);
+    CREATE INDEX IF NOT EXISTS idx_samples_status ON samples (project, status);
+    CREATE INDEX IF NOT EXISTS idx_samples_created ON samples (project, created);
+    CREATE INDEX IF NOT EXISTS idx_samples_seq ON samples (project, seq);
+    CREATE TABLE IF NOT EXISTS migrated (name TEXT PRIMARY KEY);
+    """
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.migration_issues = {}  # 项目名 -> 迁移时的问题说明，由界面/命令行显示
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _query(self, sql, args=()):
+        with self.lock: return self.conn.execute(sql, args).fetchall()
+
+    def list_projects(self): return [r[0] for r in self._query("SELECT name FROM projects")]
+    def exists(self, project): return bool(self._query("SELECT 1 FROM projects WHERE name=?", (project,)))
+
+    def fingerprint(self, project):
+        r = self._query("SELECT version FROM projects WHERE name=?", (project,))
+        return r[0][0] if r else None
+
+    def load(self, project):
+        with perf.span("storage.load", backend="sqlite") as sp:
+            rows = self._query("SELECT sid, created, status, remark, content FROM samples WHERE project=? ORDER BY seq", (project,))
+            sp.set(rows=len(rows))
+            return pd.DataFrame(rows, columns=COLUMNS).fillna("").astype(str)
+
+    def _changes(self, project, df, old_df):
+        """对比新旧 DataFrame，返回 (需 UPSERT 的行, 需删除的编号)。"""
+        seq_map = dict(self._query("SELECT sid, seq FROM samples WHERE project=?", (project,)))
+        sids = df["样品编号"]
+        if old_df is None or sids.duplicated().any() or old_df["样品编号"].duplicated().any():
+            old_sids, changed = set(seq_map), pd.Series(True, index=df.index)
+        else:
+            old_sids = set(old_df["样品编号"])
+            aligned = old_df.set_index("样品编号").reindex(sids)[COLUMNS[1:]]
+            changed = pd.Series((aligned.values != df[COLUMNS[1:]].values).any(axis=1), index=df.index)
+        # 新插入的行取前后相邻旧行 seq 之间的等分点，保持原有顺序（如重命名后的行不跑到末尾）
+        seqs = sids.map(seq_map).astype(float)
+        new = seqs.isna()
+        if new.any():
+            top = max(seq_map.values(), default=0.0)
+            run = (~new).cumsum()
+            k = new.astype(int).groupby(run).cumsum()
+            m = new.astype(int).groupby(run).transform("sum")
+            prev, nxt = seqs.ffill().fillna(0.0), seqs.bfill()
+            spread = prev + (nxt - prev) * k / (m + 1)
+            seqs = seqs.fillna(spread.where(nxt.notna(), top + k))
+        sub = df[changed.to_numpy()]
+        rows = list(zip([project] * len(sub), sub["样品编号"], seqs[changed.to_numpy()],
+                        *(sub[c] for c in COLUMNS[1:])))
+        return rows, old_sids - set(sids)
+
+    def _write(self, project, rows, removed, append=False):
+        """一个事务内删除 removed 并 UPSERT rows (已有编号保留原 seq)；append 时 rows 中的 seq 为相对末尾的偏移。"""
+        with self.lock, perf.span("storage.save", backend="sqlite", rows=len(rows), deleted=len(removed)):
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("INSERT OR IGNORE INTO projects (name) VALUES (?)", (project,))
+                cur.executemany("DELETE FROM samples WHERE project=? AND sid=?", [(project, s) for s in removed])
+                if append:
+                    top = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM samples WHERE project=?", (project,)).fetchone()[0]
+                    rows = [(r[0], r[1], top + r[2]) + tuple(r[3:]) for r in rows]
+                cur.executemany(
+                    "INSERT INTO samples (project, sid, seq, created, status, remark, content) VALUES (?,?,?,?,?,?,?) "
+                    "ON CONFLICT(project, sid) DO UPDATE SET created=excluded.created, status=excluded.status, "
+                    "remark=excluded.remark, content=excluded.content", rows)
+                cur.execute("UPDATE projects SET version = version + 1 WHERE name=?", (project,))
+                ver = cur.execute("SELECT version FROM projects WHERE name=?", (project,)).fetchone()[0]
+                cur.execute("COMMIT")
+            except:
+                cur.execute("ROLLBACK"); raise
+        return ver
+
+    def save(self, project, df, old_df=None):
+        with perf.span("storage.diff", backend="sqlite", rows=len(df)):
+            rows, removed = self._changes(project, df, old_df)
+        return self._write(project, rows, removed)
+
+    def save_rows(self, project, rows, removed=()):
+        """只写入 rows (编号不重复的 DataFrame) 并删除 removed，不读取/比较整个项目；新编号排在末尾。返回新指纹。"""
+        recs = list(zip([project] * len(rows), rows["样品编号"], range(1, len(rows) + 1), *(rows[c] for c in COLUMNS[1:])))
+        return self._write(project, recs, set(removed), append=True)
+
+    def rename(self, old, new):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute("UPDATE samples SET project=? WHERE project=?", (new, old))
+                cur.execute("UPDATE projects SET name=?, version = version + 1 WHERE name=?", (new, old))
+                cur.execute("COMMIT")
+            except:
+                cur.execute("ROLLBACK"); raise
+
+    def delete(self, project):
+        with self.lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("DELETE FROM samples WHERE project=?", (project,))
+            cur.execute("DELETE FROM projects WHERE name=?", (project,))
+            cur.execute("COMMIT")
+
+    def export_csv(self, project, dst):
+        self.load(project).to_csv(dst, index=False, encoding='utf-8')
+
+    def migrate_csv(self):
+        """一次性导入 Projects/*.csv；已导入过的文件名记录在 migrated 表，不会重复导入。
+
+        读不了的文件 (如 Excel 另存的 GBK 编码) 跳过且不记录，下次启动重试；重复编号只保留最后一行。
+        两种情况都记在 migration_issues 中。
+        """
+        done = {r[0] for r in self._query("SELECT name FROM migrated")}
+        imported = []
+        for f in sorted(os.listdir(config.PROJECTS_DIR)):
+            name = f[:-4]
+            if not f.endswith(".csv") or name in done: continue
+            if not self.exists(name):
+                try: df = _read_project_csv(os.path.join(config.PROJECTS_DIR, f), strict=True)
+                except Exception as e:
+                    self.migration_issues[name] = f"无法读取，未导入 (请另存为 UTF-8 后重启): {type(e).__name__}: {e}"
+                    continue
+                dup = df["样品编号"].duplicated(keep="last")
+                if dup.any():
+                    ids = ", ".join(sorted(set(df.loc[dup, "样品编号"])))
+                    self.migration_issues[name] = f"{int(dup.sum())} 行重复编号只导入了最后一行 (原 CSV 未改动): {ids}"
+                self.save(name, df[~dup])
+                imported.append(name)
+            with self.lock: self.conn.execute("INSERT OR IGNORE INTO migrated (name) VALUES (?)", (name,))
+        return imported
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage():
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            config.ensure_dirs()
+            if config.STORAGE_BACKEND == "csv": _storage = CsvStorage()
+            else:
+                _storage = SqliteStorage(config.DB_FILE)
+                _storage.migrate_csv()
+        return _storage